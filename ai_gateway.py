@@ -0,0 +1,244 @@
+"""Shared Gemini gateway used by every page.
+
+The client is built lazily, once per server process, and kept in module
+globals so Streamlit reruns reuse the same HTTP connection pool instead of
+re-reading the config and re-negotiating TLS on every interaction.
+"""
+import json
+import os
+import threading
+
+import yaml
+
+from response_cache import ResponseCache
+
+MODEL_NAME = 'gemini-3-flash-preview'
+
+# Point the SDK at another endpoint (e.g. a local fake server for testing)
+BASE_URL_ENV = 'GEMINI_BASE_URL'
+
+# Keep-alive pool shared by every session in this process
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY_SECONDS = 120
+
+_lock = threading.Lock()
+_client = None
+_sdk = None
+_genai = None
+_init_error = None
+_legacy_models = {}
+
+# Replies to repeated text prompts (quick actions, common questions)
+response_cache = ResponseCache(max_entries=256, ttl_seconds=3600)
+
+
+def load_api_key():
+    """Read the API key from the environment, falling back to config.yaml"""
+    api_key = os.environ.get('API_KEY', '')
+    if not api_key:
+        try:
+            with open('config.yaml', 'r') as f:
+                file = yaml.safe_load(f)
+            api_key = file.get('API_KEY', '') if file else ''
+        except FileNotFoundError:
+            api_key = ''
+    return api_key
+
+
+def _http_options(types):
+    """Build HTTP options with a pooled keep-alive transport"""
+    options = {}
+    if os.environ.get(BASE_URL_ENV):
+        options['base_url'] = os.environ[BASE_URL_ENV]
+    try:
+        import httpx
+        options['client_args'] = {'limits': httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+        )}
+    except ImportError:
+        pass
+    try:
+        return types.HttpOptions(**options) if options else None
+    except Exception:
+        return None
+
+
+def _build_client():
+    """Resolve the installed SDK and create the process-wide client"""
+    global _client, _sdk, _genai, _init_error
+    _init_error = None
+    api_key = load_api_key()
+    try:
+        from google import genai
+        from google.genai import types
+        _sdk = "google-genai"
+        http_options = _http_options(types)
+        if http_options is not None:
+            _client = genai.Client(api_key=api_key, http_options=http_options)
+        else:
+            _client = genai.Client(api_key=api_key)
+        _genai = genai
+    except ImportError:
+        try:
+            import google.generativeai as genai
+            _sdk = "google-generativeai"
+            genai.configure(api_key=api_key)
+            _client = genai
+            _genai = genai
+        except ImportError:
+            _init_error = "Missing Google AI SDK. Install `google-genai` or `google-generativeai`."
+    except Exception as e:
+        _init_error = f"Connection Error: {e}"
+
+
+def get_client():
+    """Return the shared client, creating it on first use.
+
+    Only a successful client is kept; after a failure (e.g. a missing API
+    key) the next call tries again, so fixing config.yaml needs no restart.
+    """
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _build_client()
+    return _client
+
+
+def is_available():
+    """True when an SDK is installed and the client was created"""
+    return get_client() is not None
+
+
+def init_error():
+    """Return the error raised while creating the client, if any"""
+    get_client()
+    return _init_error
+
+
+def _legacy_model(model):
+    """Return a cached GenerativeModel for the legacy SDK"""
+    if model not in _legacy_models:
+        _legacy_models[model] = _genai.GenerativeModel(model)
+    return _legacy_models[model]
+
+
+def generate(contents, model=MODEL_NAME, cached_content=None):
+    """Send a prompt (text or list of parts) and return the reply text.
+
+    `cached_content` is the name of a context cache from create_cache to
+    answer against.
+    """
+    client = get_client()
+    if client is None:
+        raise RuntimeError(_init_error or "AI unavailable")
+    if _sdk == "google-genai":
+        config = {'cached_content': cached_content} if cached_content else None
+        response = client.models.generate_content(model=model, contents=contents, config=config)
+    else:  # google-generativeai
+        if cached_content:
+            raise RuntimeError("Context caching needs the google-genai SDK")
+        response = _legacy_model(model).generate_content(contents)
+    return response.text
+
+
+def generate_json(contents, schema, model=MODEL_NAME, timeout=None):
+    """Request structured output matching `schema` and return the parsed JSON.
+
+    `timeout` (seconds) bounds this one request.
+    """
+    client = get_client()
+    if client is None:
+        raise RuntimeError(_init_error or "AI unavailable")
+    config = {'response_mime_type': 'application/json', 'response_schema': schema}
+    if _sdk == "google-genai":
+        if timeout:
+            config['http_options'] = {'timeout': int(timeout * 1000)}
+        response = client.models.generate_content(model=model, contents=contents, config=config)
+    else:  # google-generativeai
+        request_options = {'timeout': timeout} if timeout else None
+        response = _legacy_model(model).generate_content(contents, generation_config=config,
+                                                         request_options=request_options)
+    return json.loads(response.text)
+
+
+def generate_stream(contents, model=MODEL_NAME):
+    """Send a prompt and yield reply text chunks as they arrive"""
+    client = get_client()
+    if client is None:
+        raise RuntimeError(_init_error or "AI unavailable")
+    if _sdk == "google-genai":
+        stream = client.models.generate_content_stream(model=model, contents=contents)
+    else:  # google-generativeai
+        stream = _legacy_model(model).generate_content(contents, stream=True)
+    for chunk in stream:
+        text = getattr(chunk, 'text', None)
+        if text:
+            yield text
+
+
+def upload(file, mime_type='application/pdf'):
+    """Upload a file (path or file-like object) and return its remote reference"""
+    client = get_client()
+    if client is None:
+        raise RuntimeError(_init_error or "AI unavailable")
+    if _sdk == "google-genai":
+        return client.files.upload(file=file, config={'mime_type': mime_type})
+    # google-generativeai
+    return _genai.upload_file(path=file, mime_type=mime_type)
+
+
+def delete_file(file_ref):
+    """Delete a previously uploaded file"""
+    client = get_client()
+    if client is None:
+        raise RuntimeError(_init_error or "AI unavailable")
+    if _sdk == "google-genai":
+        client.files.delete(name=file_ref.name)
+    else:  # google-generativeai
+        _genai.delete_file(file_ref.name)
+
+
+def create_cache(contents, ttl_seconds, system_instruction=None, model=MODEL_NAME):
+    """Register `contents` as cached context and return the cache object"""
+    client = get_client()
+    if client is None:
+        raise RuntimeError(_init_error or "AI unavailable")
+    if _sdk != "google-genai":
+        raise RuntimeError("Context caching needs the google-genai SDK")
+    config = {'contents': contents, 'ttl': f'{int(ttl_seconds)}s'}
+    if system_instruction:
+        config['system_instruction'] = system_instruction
+    return client.caches.create(model=model, config=config)
+
+
+def delete_cache(name):
+    """Delete a context cache created by create_cache"""
+    client = get_client()
+    if client is None:
+        raise RuntimeError(_init_error or "AI unavailable")
+    if _sdk != "google-genai":
+        raise RuntimeError("Context caching needs the google-genai SDK")
+    client.caches.delete(name=name)
+
+
+def get_ai_response(contents, model=MODEL_NAME, use_cache=True):
+    """Get AI response with proper error handling.
+
+    Plain text prompts are served from `response_cache` when possible;
+    pass use_cache=False to always call the model.
+    """
+    cacheable = use_cache and isinstance(contents, str)
+    if cacheable:
+        cached = response_cache.get(contents, model)
+        if cached is not None:
+            return cached
+    try:
+        reply = generate(contents, model=model)
+    except Exception as e:
+        return f'❌ Error: {str(e)}'
+    if cacheable and reply:
+        response_cache.put(contents, model, reply)
+    return reply
@@ -0,0 +1,116 @@
+"""Background execution of AI calls.
+
+AI requests are submitted to a process-wide thread pool and identified by a
+job ID that pages keep in session state. Pages poll the job from an
+auto-refreshing fragment instead of blocking the script thread, so a rerun
+never waits on the model.
+
+Workers run outside the Streamlit script context and must not touch
+`st.session_state`; pass everything they need as arguments.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 16
+
+# Finished jobs nobody collected (e.g. the user closed the tab) are dropped after this
+JOB_TTL_SECONDS = 600
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ai-job")
+_jobs = {}
+_lock = threading.Lock()
+
+
+class AIJob:
+    """Handle for one submitted AI request"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.future = None
+        self.chunks = []
+        self.submitted_at = time.perf_counter()
+        self.ttft = None
+        self.total = None
+        self.stream_value = None
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def partial_text(self):
+        """Text streamed so far (streaming jobs only)"""
+        return "".join(self.chunks)
+
+    def result(self):
+        """Return the reply text, turning worker exceptions into an error message"""
+        try:
+            return self.future.result()
+        except Exception as e:
+            return f'❌ Error: {str(e)}'
+
+
+def _prune():
+    """Forget finished jobs that were never collected"""
+    now = time.perf_counter()
+    with _lock:
+        stale = [job_id for job_id, job in _jobs.items()
+                 if job.done() and now - job.submitted_at > JOB_TTL_SECONDS]
+        for job_id in stale:
+            del _jobs[job_id]
+
+
+def _register(worker, *args, **kwargs):
+    _prune()
+    job = AIJob(uuid.uuid4().hex)
+    with _lock:
+        _jobs[job.job_id] = job
+    job.future = _executor.submit(worker, job, *args, **kwargs)
+    return job.job_id
+
+
+def _run(job, fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        job.total = time.perf_counter() - job.submitted_at
+
+
+def _run_stream(job, stream_fn, *args, **kwargs):
+    try:
+        stream = stream_fn(*args, **kwargs)
+        while True:
+            try:
+                text = next(stream)
+            except StopIteration as stop:
+                # Whatever the generator returns is handed back on the job
+                job.stream_value = stop.value
+                break
+            if job.ttft is None:
+                job.ttft = time.perf_counter() - job.submitted_at
+            job.chunks.append(text)
+        return job.partial_text()
+    finally:
+        job.total = time.perf_counter() - job.submitted_at
+
+
+def submit(fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) in the background and return its job ID"""
+    return _register(_run, fn, *args, **kwargs)
+
+
+def submit_stream(stream_fn, *args, **kwargs):
+    """Consume a chunk generator in the background, exposing partial text as it arrives"""
+    return _register(_run_stream, stream_fn, *args, **kwargs)
+
+
+def get(job_id):
+    """Return the job for an ID, or None if it is unknown or expired"""
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def discard(job_id):
+    """Forget a job once its result has been collected"""
+    with _lock:
+        _jobs.pop(job_id, None)
@@ -0,0 +1,165 @@
+"""BM25 relevance of interview answers to their questions.
+
+The question is the query and the answer is the document. Term IDF and
+the average document length are precomputed once over the interview
+question source and a reference answer corpus, then cached in a JSON file
+keyed by a hash of those sources and the tokenizer settings, so a process
+only rebuilds the table when either changes. Question terms are cached per
+question, so scoring an answer is one tokenize pass plus a lookup per
+question term.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+
+import question_bank
+
+REFERENCE_ANSWERS_PATH = os.path.join(question_bank.DATA_DIR, 'reference_answers.txt')
+# Where the IDF table is cached; if it can't be written the table is only kept in memory
+IDF_CACHE_PATH = os.environ.get('FMF_RELEVANCE_CACHE', os.path.join(question_bank.DATA_DIR, 'relevance_idf.json'))
+
+# Standard BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Shorter questions carry too little signal to judge an answer against
+MIN_QUERY_TERMS = 2
+
+STOPWORDS = frozenset("""
+a above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you
+your yours yourselves us
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SUFFIX_RE = re.compile(r"(?:ing|ed|es|s)$")
+
+_lock = threading.Lock()
+_table = None
+
+
+def _stem(token):
+    # Crude suffix stripping, applied to both sides: "leading"/"leads" -> "lead" and
+    # "processes" -> "process", but "process" -> "proces" too, and short words such
+    # as "led" are never stripped
+    return _SUFFIX_RE.sub('', token) if len(token) > 4 else token
+
+
+def tokenize(lowered_text):
+    """Stemmed content terms of already-lowercased text"""
+    return [_stem(t) for t in _TOKEN_RE.findall(lowered_text) if t not in STOPWORDS]
+
+
+def _corpus():
+    docs = []
+    with open(question_bank.SOURCE_PATH, 'r', encoding='utf-8') as f:
+        docs.extend(json.loads(line)['text'] for line in f if line.strip())
+    with open(REFERENCE_ANSWERS_PATH, 'r', encoding='utf-8') as f:
+        docs.extend(line.strip() for line in f if line.strip())
+    return docs
+
+
+def _corpus_hash():
+    hasher = hashlib.sha256()
+    # Tokenizer changes invalidate the table as much as corpus changes do
+    hasher.update(' '.join(sorted(STOPWORDS)).encode('utf-8'))
+    hasher.update(_SUFFIX_RE.pattern.encode('utf-8'))
+    for path in (question_bank.SOURCE_PATH, REFERENCE_ANSWERS_PATH):
+        with open(path, 'rb') as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+def build_table(docs):
+    """IDF per term, the IDF of unseen terms and the average document length"""
+    df = Counter()
+    total_length = 0
+    for doc in docs:
+        terms = tokenize(doc.lower())
+        total_length += len(terms)
+        df.update(set(terms))
+    n = len(docs)
+    return {
+        'idf': {term: math.log((n - count + 0.5) / (count + 0.5) + 1) for term, count in df.items()},
+        'unseen_idf': math.log((n + 0.5) / 0.5 + 1),
+        'avgdl': total_length / n if n else 1.0
+    }
+
+
+def _save(table):
+    tmp_path = f"{IDF_CACHE_PATH}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(table, f)
+        os.replace(tmp_path, IDF_CACHE_PATH)
+    except OSError:
+        # Read-only deploy; the next process rebuilds the table
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def get_table():
+    """Return the IDF table, loading it from disk or rebuilding it when the corpus changed"""
+    global _table
+    if _table is None:
+        with _lock:
+            if _table is None:
+                corpus_hash = _corpus_hash()
+                try:
+                    with open(IDF_CACHE_PATH, 'r', encoding='utf-8') as f:
+                        table = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    table = None
+                if table is None or table.get('corpus_hash') != corpus_hash:
+                    table = build_table(_corpus())
+                    table['corpus_hash'] = corpus_hash
+                    _save(table)
+                _table = table
+    return _table
+
+
+@lru_cache(maxsize=1024)
+def _query(question_lower):
+    """(term, idf) pairs for a question and the score of a typical on-topic answer.
+
+    That reference is an average-length answer using every question term
+    once, where each term contributes idf * (K1 + 1) / (1 + K1) = idf.
+    """
+    table = get_table()
+    idf, unseen = table['idf'], table['unseen_idf']
+    terms = tuple((term, idf.get(term, unseen)) for term in dict.fromkeys(tokenize(question_lower)))
+    return terms, sum(weight for _, weight in terms)
+
+
+def score(question_lower, answer_lower):
+    """Return (BM25 score, relevance 0-1) of an answer to a question, both lowercased.
+
+    Relevance is the BM25 score over that of an average-length answer using
+    each question term once, capped at 1. It is None when the question has
+    fewer than MIN_QUERY_TERMS content terms.
+    """
+    terms, reference = _query(question_lower)
+    if len(terms) < MIN_QUERY_TERMS:
+        return 0.0, None
+    answer_terms = tokenize(answer_lower)
+    if not answer_terms:
+        return 0.0, 0.0
+    tf = Counter(answer_terms)
+    norm = K1 * (1 - B + B * len(answer_terms) / get_table()['avgdl'])
+    bm25 = 0.0
+    for term, weight in terms:
+        freq = tf.get(term)
+        if freq:
+            bm25 += weight * freq * (K1 + 1) / (freq + norm)
+    return bm25, min(1.0, bm25 / reference)
@@ -0,0 +1,144 @@
+"""Deterministic local ATS pre-check.
+
+Runs on the extracted resume text with precompiled patterns. It detects
+sections and measures bullet density, quantified achievements, action-verb
+usage, skill coverage and contact details. Results are cached per resume
+hash and take milliseconds, so the Resume page can show them before the AI
+review arrives.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+import resume_text
+
+MAX_CACHED_CHECKS = 128
+
+EXPECTED_SECTIONS = ['Summary', 'Experience', 'Skills', 'Education']
+
+ACTION_VERBS = frozenset("""
+accelerated achieved administered analyzed architected automated built championed collaborated
+completed conducted coordinated created cut decreased delivered designed developed directed drove
+enhanced established executed expanded facilitated founded generated grew guided implemented
+improved increased initiated launched led managed mentored migrated negotiated optimized
+orchestrated organized oversaw partnered pioneered planned produced programmed published raised
+redesigned reduced refactored resolved revamped saved scaled secured shipped simplified
+spearheaded streamlined strengthened supervised taught tested trained transformed won wrote
+""".split())
+
+_BULLET_RE = re.compile(r'^\s*(?:[•\-*▪●◦‣–]|\d+[.)])\s+')
+_NUMBER_RE = re.compile(r'(?:\d+(?:[.,]\d+)*\s*(?:%|percent|x\b|k\b|m\b)?|\$\s?\d)', re.IGNORECASE)
+# Years and date ranges ("2019", "2019–2023", "03/2021 - Present") are not achievements
+_DATE_RE = re.compile(
+    r'(?<![$\d.,])(?:\d{1,2}/)?(?:19|20)\d{2}\b(?!\s*%)'
+    r'(?:\s*[-–—]\s*(?:(?:\d{1,2}/)?(?:19|20)\d{2}\b|present\b|current\b|now\b))?',
+    re.IGNORECASE
+)
+_FIRST_WORD_RE = re.compile(r'^\s*(?:[•\-*▪●◦‣–]|\d+[.)])?\s*([A-Za-z]+)')
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_PHONE_RE = re.compile(r'(?:\+?\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}')
+_LINKEDIN_RE = re.compile(r'linkedin\.com/', re.IGNORECASE)
+_SKILL_SPLIT_RE = re.compile(r'[,;|•\n/]')
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _ratio(part, whole):
+    return part / whole if whole else 0.0
+
+
+def _is_quantified(line):
+    return bool(_NUMBER_RE.search(_DATE_RE.sub(' ', line)))
+
+
+def _skill_pattern(skill):
+    # Whole-word match that still works for skills like "c++", "c#" and ".net"
+    return re.compile(rf'(?<![\w+#]){re.escape(skill)}(?![\w+#])')
+
+
+def analyze(index):
+    """Run every check on a resume_text.ResumeIndex"""
+    sections = index.sections
+    found_sections = [s for s in EXPECTED_SECTIONS if s in sections]
+
+    body_lines = [line for name in ('Experience', 'Projects') if name in sections
+                  for line in sections[name].splitlines() if line.strip()]
+    bullets = [line for line in body_lines if _BULLET_RE.match(line)]
+    statements = bullets or body_lines
+
+    quantified = sum(1 for line in statements if _is_quantified(line))
+    action_led = 0
+    for line in statements:
+        match = _FIRST_WORD_RE.match(line)
+        if match and match.group(1).lower() in ACTION_VERBS:
+            action_led += 1
+
+    skills = [s.strip().lower() for s in _SKILL_SPLIT_RE.split(sections.get('Skills', '')) if 2 <= len(s.strip()) <= 40]
+    evidence_text = "\n".join(body_lines).lower()
+    evidenced = [s for s in skills if _skill_pattern(s).search(evidence_text)]
+
+    result = {
+        'sections_found': found_sections,
+        'sections_missing': [s for s in EXPECTED_SECTIONS if s not in sections],
+        'bullet_density': _ratio(len(bullets), len(body_lines)),
+        'quantified_ratio': _ratio(quantified, len(statements)),
+        'action_verb_ratio': _ratio(action_led, len(statements)),
+        'skill_coverage': _ratio(len(evidenced), len(skills)),
+        'has_email': bool(_EMAIL_RE.search(index.text)),
+        'has_phone': bool(_PHONE_RE.search(index.text)),
+        'has_linkedin': bool(_LINKEDIN_RE.search(index.text)),
+        'word_count': len(index.text.split())
+    }
+    result['score'] = _score(result)
+    result['tips'] = _tips(result)
+    return result
+
+
+def _score(r):
+    score = 40 * _ratio(len(r['sections_found']), len(EXPECTED_SECTIONS))
+    score += 15 * min(1.0, r['bullet_density'] / 0.6)
+    score += 15 * min(1.0, r['quantified_ratio'] / 0.5)
+    score += 15 * min(1.0, r['action_verb_ratio'] / 0.7)
+    score += 5 * r['skill_coverage']
+    score += 5 if r['has_email'] else 0
+    score += 5 if r['has_phone'] else 0
+    return int(round(score))
+
+
+def _tips(r):
+    tips = []
+    if r['sections_missing']:
+        tips.append(f"Add clearly titled sections: {', '.join(r['sections_missing'])}.")
+    if r['bullet_density'] < 0.5:
+        tips.append("Use bullet points for experience so ATS parsers can split your achievements.")
+    if r['quantified_ratio'] < 0.3:
+        tips.append("Quantify more achievements with numbers, percentages or dollar amounts.")
+    if r['action_verb_ratio'] < 0.5:
+        tips.append("Start bullets with strong action verbs (Led, Built, Increased...).")
+    if r['skill_coverage'] < 0.3 and 'Skills' in r['sections_found']:
+        tips.append("Back up listed skills by mentioning them in your experience bullets.")
+    if not r['has_email'] or not r['has_phone']:
+        tips.append("Make sure your email and phone number are in plain text at the top.")
+    if not r['has_linkedin']:
+        tips.append("Consider adding your LinkedIn profile URL.")
+    if r['word_count'] > 900:
+        tips.append("The resume is long; aim for one to two pages.")
+    return tips
+
+
+def check(pdf_hash):
+    """Return the ATS pre-check for a stored resume, or None if it has no extractable text"""
+    with _lock:
+        if pdf_hash in _cache:
+            _cache.move_to_end(pdf_hash)
+            return _cache[pdf_hash]
+
+    index = resume_text.get_index(pdf_hash)
+    result = analyze(index) if index.usable else None
+
+    with _lock:
+        _cache[pdf_hash] = result
+        while len(_cache) > MAX_CACHED_CHECKS:
+            _cache.popitem(last=False)
+    return result
@@ -0,0 +1,139 @@
+"""Score a directory of resume PDFs offline.
+
+Runs the same pipeline as the Resume page (upload, structured initial
+review, score) for every PDF in a directory, with bounded concurrency and
+retry with exponential backoff. Each resume gets one JSONL record;
+rerunning with the same output file skips resumes already scored.
+
+    python batch_review.py resumes/ -o scores.jsonl --concurrency 8
+
+Set --base-url (or GEMINI_BASE_URL) to run against a local fake Gemini
+server.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import ai_gateway
+import resume_review
+import upload_manager
+
+
+def load_done(output_path):
+    """Content hashes of resumes already scored successfully in the output file"""
+    done = set()
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial last line from an interrupted run
+                    continue
+                if record.get('status') == 'ok':
+                    done.add(record.get('sha256'))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def find_pdfs(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith('.pdf')
+    )
+
+
+def review_one(path, digest, retries, backoff):
+    """Upload and review one resume, retrying failures with exponential backoff"""
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        pdf_bytes = f.read()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            file_ref, _ = upload_manager.get_or_upload(pdf_bytes, digest=digest)
+            review = resume_review.run_review(file_ref, digest)
+            return {
+                'file': os.path.basename(path),
+                'sha256': digest,
+                'status': 'ok',
+                'score': review['score'],
+                'review': review,
+                'attempts': attempt,
+                'elapsed': round(time.perf_counter() - start, 3)
+            }
+        except Exception as e:
+            if attempt > retries:
+                return {
+                    'file': os.path.basename(path),
+                    'sha256': digest,
+                    'status': 'error',
+                    'error': str(e),
+                    'attempts': attempt,
+                    'elapsed': round(time.perf_counter() - start, 3)
+                }
+            time.sleep(backoff * (2 ** (attempt - 1)) * (1 + random.random()))
+
+
+def run(directory, output_path, concurrency=4, retries=3, backoff=1.0):
+    """Review every pending PDF in `directory`, appending records to `output_path`"""
+    done = load_done(output_path)
+    seen = set(done)
+    pending = []
+    for path in find_pdfs(directory):
+        with open(path, 'rb') as f:
+            digest = upload_manager.content_hash(f.read())
+        # Identical files in the directory are reviewed once
+        if digest not in seen:
+            seen.add(digest)
+            pending.append((path, digest))
+
+    skipped = len(done)
+    counts = {'ok': 0, 'error': 0}
+    print(f"{len(pending)} resume(s) to review, {skipped} already done", file=sys.stderr)
+
+    with open(output_path, 'a', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(review_one, path, digest, retries, backoff)
+                   for path, digest in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            # Flush per record so an interrupted run can be resumed
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+            counts[record['status']] += 1
+            print(f"[{record['status']}] {record['file']}", file=sys.stderr)
+
+    print(f"Done: {counts['ok']} ok, {counts['error']} failed", file=sys.stderr)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a directory of resume PDFs.")
+    parser.add_argument('directory', help="Directory containing resume PDFs")
+    parser.add_argument('-o', '--output', default='resume_scores.jsonl', help="JSONL output file")
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help="Resumes reviewed at once")
+    parser.add_argument('--retries', type=int, default=3, help="Retries per resume after the first attempt")
+    parser.add_argument('--backoff', type=float, default=1.0, help="Base backoff in seconds")
+    parser.add_argument('--base-url', help="Gemini API base URL (e.g. a local fake server)")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.base_url:
+        os.environ[ai_gateway.BASE_URL_ENV] = args.base_url
+    if not ai_gateway.is_available():
+        parser.exit(1, f"{ai_gateway.init_error()}\n")
+
+    counts = run(args.directory, args.output, args.concurrency, args.retries, args.backoff)
+    return 1 if counts['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
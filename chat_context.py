@@ -0,0 +1,117 @@
+"""Token-budgeted conversation context for FutureBot.
+
+The most recent turns are packed into a fixed token budget. Older turns are
+folded into a rolling summary, which is only recomputed once enough turns
+have fallen out of the window since the last refresh. That keeps prompt
+size flat no matter how long the chat gets.
+"""
+import ai_gateway
+
+CONTEXT_TOKEN_BUDGET = 1500
+
+# Recompute the summary once this many turns have left the window unsummarized
+SUMMARY_REFRESH_MESSAGES = 8
+SUMMARY_MAX_WORDS = 150
+
+# Cap on how much unsummarized history one refresh may send
+SUMMARY_INPUT_BUDGET = 3000
+
+ROLE_LABELS = {'user': 'User', 'assistant': 'FutureBot'}
+
+
+def estimate_tokens(text):
+    """Rough local token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def format_turn(msg):
+    label = ROLE_LABELS.get(msg.get('role'), 'FutureBot')
+    return f"{label}: {msg.get('content', '')}"
+
+
+def _usable_turns(history):
+    """Skip empty replies and error messages, which add nothing to the context"""
+    return [m for m in history
+            if m.get('content') and not m['content'].startswith('❌')]
+
+
+def window_start(turns, budget):
+    """Index of the oldest turn that still fits in the budget, newest first"""
+    used = 0
+    start = len(turns)
+    for i in range(len(turns) - 1, -1, -1):
+        cost = estimate_tokens(format_turn(turns[i]))
+        if used + cost > budget:
+            break
+        used += cost
+        start = i
+    return start
+
+
+def refresh_summary(turns, start, summary_state, summarize_fn):
+    """Fold turns older than the window into the rolling summary when it is stale"""
+    upto = summary_state.get('upto', 0)
+    if upto > start:
+        # History shrank (e.g. chat cleared); start over
+        summary_state.clear()
+        upto = 0
+    if start - upto < SUMMARY_REFRESH_MESSAGES:
+        return
+
+    pending = turns[upto:start]
+    pending = pending[window_start(pending, SUMMARY_INPUT_BUDGET):]
+    folded = "\n".join(format_turn(m) for m in pending)
+    previous = summary_state.get('text', '')
+    prompt = f"""Summarize this career-coaching conversation in at most {SUMMARY_MAX_WORDS} words.
+Keep the user's goals, background and any advice already given.
+
+Previous summary:
+{previous or '(none)'}
+
+New turns:
+{folded}"""
+
+    text = summarize_fn(prompt)
+    if text and not text.startswith('❌'):
+        summary_state['text'] = text
+        summary_state['upto'] = start
+
+
+def build_prompt(history, query, summary_state, summarize_fn, budget=CONTEXT_TOKEN_BUDGET):
+    """Build a prompt from the summary, the most recent turns and the new query.
+
+    `history` holds the turns before `query`. `summary_state` is a dict kept
+    across calls (in session state) holding the cached summary.
+    """
+    turns = _usable_turns(history)
+    if not turns:
+        return query
+
+    summary_cost = estimate_tokens(summary_state.get('text', ''))
+    turn_budget = max(0, budget - estimate_tokens(query) - summary_cost)
+    start = window_start(turns, turn_budget)
+    refresh_summary(turns, start, summary_state, summarize_fn)
+
+    parts = ["You are FutureBot, a career assistant. Continue this conversation."]
+    if summary_state.get('text'):
+        parts.append(f"Summary of earlier conversation:\n{summary_state['text']}")
+    if start < len(turns):
+        parts.append("Recent conversation:\n" + "\n".join(format_turn(m) for m in turns[start:]))
+    parts.append(f"User: {query}\nFutureBot:")
+    return "\n\n".join(parts)
+
+
+def _summarize(prompt_text):
+    return ai_gateway.get_ai_response(prompt_text, use_cache=False)
+
+
+def stream_reply(history, query, summary_state):
+    """Build the budgeted prompt and stream the reply (runs in a background job).
+
+    Works on a copy of `summary_state` and returns the updated summary once
+    the stream ends, so only the script thread writes it back to session state.
+    """
+    summary = dict(summary_state)
+    prompt = build_prompt(history, query, summary, _summarize)
+    yield from ai_gateway.generate_stream(prompt)
+    return summary
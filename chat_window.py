@@ -0,0 +1,30 @@
+"""Windowed rendering of long chat histories.
+
+Pages only render the last page of messages and let the user load earlier
+ones on demand, so a rerun's payload no longer grows with chat length.
+Rendered message HTML is memoized so unchanged messages are not rebuilt.
+"""
+from functools import lru_cache
+
+CHAT_PAGE_SIZE = 20
+
+MESSAGE_CLASSES = {
+    'user': ('user-message', '👤 '),
+    'ai': ('ai-message', '🤖 '),
+    'system': ('system-message', '')
+}
+
+
+def visible_window(history, visible_count):
+    """Return (number of hidden earlier messages, messages to render)"""
+    start = max(0, len(history) - visible_count)
+    return start, history[start:]
+
+
+@lru_cache(maxsize=2048)
+def message_html(msg_type, content):
+    """HTML for one Resume page chat bubble"""
+    if msg_type not in MESSAGE_CLASSES:
+        return None
+    css_class, prefix = MESSAGE_CLASSES[msg_type]
+    return f"<div class='{css_class}'>{prefix}{content}</div>"
@@ -0,0 +1,142 @@
+"""Gemini context caching for resume follow-up questions.
+
+When a resume is uploaded its file is registered once as cached content
+with a TTL, keyed by the PDF content hash and shared by every session in
+this process. Sessions hold the cache while they use it; it is deleted
+when the last one releases it, or expires by its TTL. Follow-up questions then send only the question and
+reference the cache, so the resume tokens are billed at the cached rate
+and not re-sent. When there is no live cache (expired, deleted, too small
+to cache, or a legacy SDK) questions fall back to inline context via
+resume_text.ask.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import ai_gateway
+import resume_text
+
+CONTEXT_TTL_SECONDS = 60 * 60
+
+# Stop using a cache shortly before the server drops it
+EXPIRY_MARGIN_SECONDS = 60
+
+# Resumes the API refused to cache are retried after this, and only this many are remembered
+UNAVAILABLE_TTL_SECONDS = CONTEXT_TTL_SECONDS
+MAX_UNAVAILABLE = 1024
+
+SYSTEM_INSTRUCTION = (
+    "You are a career coach reviewing the attached resume. "
+    "Answer questions about it specifically and concisely."
+)
+
+_caches = {}   # pdf hash -> (cache name, expires at)
+_holders = {}   # pdf hash -> sessions using its cache
+_unavailable = OrderedDict()   # pdf hash the API refused to cache -> retry after
+_lock = threading.Lock()
+_hash_locks = {}
+
+
+def _expires_at(cache):
+    expiration = getattr(cache, 'expire_time', None)
+    if isinstance(expiration, datetime):
+        return expiration.timestamp()
+    return time.time() + CONTEXT_TTL_SECONDS
+
+
+def _lock_for(pdf_hash):
+    with _lock:
+        return _hash_locks.setdefault(pdf_hash, threading.Lock())
+
+
+def lookup(pdf_hash):
+    """Return the name of a live cache for the resume, or None"""
+    with _lock:
+        entry = _caches.get(pdf_hash)
+        if entry and entry[1] - EXPIRY_MARGIN_SECONDS <= time.time():
+            del _caches[pdf_hash]
+            _holders.pop(pdf_hash, None)
+            entry = None
+    return entry[0] if entry else None
+
+
+def _is_unavailable(pdf_hash):
+    # Caller holds _lock
+    retry_after = _unavailable.get(pdf_hash)
+    if retry_after is not None and retry_after <= time.time():
+        del _unavailable[pdf_hash]
+        retry_after = None
+    return retry_after is not None
+
+
+def _mark_unavailable(pdf_hash):
+    # Caller holds _lock
+    _unavailable[pdf_hash] = time.time() + UNAVAILABLE_TTL_SECONDS
+    _unavailable.move_to_end(pdf_hash)
+    while len(_unavailable) > MAX_UNAVAILABLE:
+        _unavailable.popitem(last=False)
+
+
+def register(pdf_hash, file_ref, ttl_seconds=CONTEXT_TTL_SECONDS):
+    """Cache the uploaded resume as context and return the cache name, or None"""
+    with _lock_for(pdf_hash):
+        name = lookup(pdf_hash)
+        if name is not None:
+            return name
+        with _lock:
+            if _is_unavailable(pdf_hash):
+                return None
+        try:
+            cache = ai_gateway.create_cache([file_ref], ttl_seconds, SYSTEM_INSTRUCTION)
+        except Exception:
+            # Below the minimum cacheable size or not supported; use inline context
+            with _lock:
+                _mark_unavailable(pdf_hash)
+            return None
+        with _lock:
+            _caches[pdf_hash] = (cache.name, _expires_at(cache))
+        return cache.name
+
+
+def hold(pdf_hash, owner):
+    """Record that a session (user_session.get_session_id()) is using the resume's cache"""
+    with _lock:
+        _holders.setdefault(pdf_hash, set()).add(owner)
+
+
+def release(pdf_hash, owner):
+    """Drop a session's hold; the cache is deleted once no session holds it.
+
+    Sessions that end without releasing leave the cache to expire by its TTL.
+    """
+    with _lock:
+        holders = _holders.get(pdf_hash)
+        if holders:
+            holders.discard(owner)
+            if holders:
+                return
+        _holders.pop(pdf_hash, None)
+        entry = _caches.pop(pdf_hash, None)
+        _unavailable.pop(pdf_hash, None)
+        _hash_locks.pop(pdf_hash, None)
+    if entry:
+        try:
+            ai_gateway.delete_cache(entry[0])
+        except Exception:
+            # Already expired on the server side
+            pass
+
+
+def ask(file_ref, pdf_hash, question):
+    """Answer a follow-up from the cached resume, or inline context without one"""
+    name = lookup(pdf_hash)
+    if name is not None:
+        try:
+            return ai_gateway.generate(question, cached_content=name)
+        except Exception:
+            # Deleted or expired early; drop it and answer inline
+            with _lock:
+                if _caches.get(pdf_hash, (None,))[0] == name:
+                    del _caches[pdf_hash]
+    return resume_text.ask(file_ref, pdf_hash, question)
@@ -0,0 +1,99 @@
+"""Optional AI grading of mock interview answers.
+
+Each answered question is graded by its own structured Gemini request.
+Requests run on a small dedicated pool, so one interview's answers are
+graded at once (grading takes about as long as the slowest call) while a
+burst of submissions queues here instead of crowding out chat and resume
+requests on the shared ai_jobs pool. Each request carries its own
+timeout; questions without a grade by then keep their heuristic score and
+feedback.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ai_gateway
+
+GRADING_TIMEOUT_SECONDS = 30
+
+# Enough to grade one interview's answers in parallel
+MAX_GRADING_WORKERS = 8
+
+# Extra time the page waits past the request timeout for a job that was queued
+DEADLINE_MARGIN_SECONDS = 10
+
+GRADE_PROMPT = """You are an experienced interview coach. Grade the candidate's answer to the
+interview question below from 0 to 100, and give 2-3 sentences of specific,
+actionable feedback.
+
+Question: {question}
+
+Answer: {answer}"""
+
+GRADE_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'score': {'type': 'INTEGER', 'minimum': 0, 'maximum': 100},
+        'feedback': {'type': 'STRING'}
+    },
+    'required': ['score', 'feedback']
+}
+
+_executor = ThreadPoolExecutor(max_workers=MAX_GRADING_WORKERS, thread_name_prefix="grading")
+
+
+def grade_answer(question, answer, timeout=GRADING_TIMEOUT_SECONDS):
+    """Grade one answer; returns {'score', 'feedback'} or raises"""
+    data = ai_gateway.generate_json(
+        GRADE_PROMPT.format(question=question, answer=answer), GRADE_SCHEMA, timeout=timeout
+    )
+    try:
+        score = int(round(float(data.get('score'))))
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError("Grade has no numeric score")
+    feedback = str(data.get('feedback', '')).strip()
+    if not feedback:
+        raise ValueError("Grade has no feedback")
+    return {'score': max(0, min(100, score)), 'feedback': feedback}
+
+
+def submit_grading(questions, answers):
+    """Start grading every answered question; returns {question index: future}"""
+    return {
+        i: _executor.submit(grade_answer, question, answer)
+        for i, (question, answer) in enumerate(zip(questions, answers))
+        if answer.strip()
+    }
+
+
+def deadline():
+    """Time after which unfinished grades are abandoned"""
+    return time.time() + GRADING_TIMEOUT_SECONDS + DEADLINE_MARGIN_SECONDS
+
+
+def collect(jobs, detailed_feedback, expired=False):
+    """Merge finished grades into detailed_feedback in place.
+
+    Returns the jobs still pending. A failed grade, or one still pending
+    when `expired`, leaves the heuristic entry as it is.
+    """
+    pending = {}
+    for i, future in jobs.items():
+        if not future.done():
+            if expired:
+                future.cancel()
+            else:
+                pending[i] = future
+            continue
+        try:
+            grade = future.result()
+        except Exception:
+            grade = None
+        if grade:
+            detailed_feedback[i].update(score=grade['score'], feedback=grade['feedback'], graded_by='ai')
+    return pending
+
+
+def cancel(jobs):
+    """Drop grading jobs whose results are no longer wanted, skipping queued ones"""
+    for future in jobs.values():
+        future.cancel()
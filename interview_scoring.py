@@ -0,0 +1,319 @@
+"""Heuristic scoring of mock interview answers.
+
+Each answer is read once into an AnswerProfile (tokens, lowercase forms,
+counts, example hits) that analyze_answer_quality and
+generate_detailed_feedback share; score_answer runs both and is what the
+Mock Interview page calls when an answer is saved or submitted.
+score_batch computes the same features and scores for whole arrays of
+answers at once, for grading cohorts of stored transcripts. Relevance to
+the question is a BM25 score from answer_relevance; it only shapes the
+feedback and does not change the score.
+"""
+import hashlib
+import re
+from itertools import repeat
+
+import numpy as np
+
+import answer_relevance
+
+# STAR method indicators
+EXAMPLE_KEYWORDS = ['example', 'instance', 'time when', 'situation', 'project',
+                    'experience', 'specifically', 'resulted in', 'achieved', 'led to']
+_EXAMPLE_RE = re.compile('|'.join(map(re.escape, EXAMPLE_KEYWORDS)))
+
+
+class AnswerProfile:
+    """Tokens and counts of one answer, computed once"""
+
+    __slots__ = ('words', 'lowered', 'lowered_words', 'question_lower', 'word_count',
+                 'unique_words', 'letters', 'sentence_count', 'has_examples')
+
+    def __init__(self, answer, question=''):
+        answer = answer or ''
+        self.question_lower = question.lower()
+        self.words = answer.split()
+        self.lowered = answer.lower()
+        # Lowercasing never adds or removes whitespace, so these are the lowered words
+        self.lowered_words = self.lowered.split()
+        self.word_count = len(self.words)
+        self.unique_words = len(set(self.lowered_words))
+        self.letters = len(''.join(self.words))
+        self.sentence_count = sum(map(bool, map(str.strip, answer.split('.')))) if self.words else 0
+        self.has_examples = _EXAMPLE_RE.search(self.lowered) is not None
+
+    @property
+    def answered(self):
+        return self.word_count > 0
+
+    @property
+    def word_diversity(self):
+        return self.unique_words / self.word_count if self.word_count > 0 else 0
+
+    @property
+    def avg_word_length(self):
+        return self.letters / self.word_count if self.word_count > 0 else 0
+
+
+def analyze_answer_quality(answer, question, profile=None):
+    """Analyze answer quality based on multiple factors"""
+    if profile is None:
+        profile = AnswerProfile(answer, question)
+    if not profile.answered:
+        return {
+            'score': 0,
+            'word_count': 0,
+            'sentence_count': 0,
+            'has_examples': False,
+            'relevance': 0.0,
+            'relevance_score': 0.0
+        }
+    
+    word_count = profile.word_count
+    sentence_count = profile.sentence_count
+    has_examples = profile.has_examples
+    word_diversity = profile.word_diversity
+    avg_word_length = profile.avg_word_length
+    
+    # BM25 relevance to the question (reported, not scored)
+    relevance_score, relevance = answer_relevance.score(profile.question_lower, profile.lowered)
+    
+    # Calculate base score
+    score = 0
+    
+    # Length scoring (0-40 points)
+    if word_count >= 50:
+        score += 40
+    elif word_count >= 30:
+        score += 30
+    elif word_count >= 15:
+        score += 20
+    elif word_count >= 5:
+        score += 10
+    
+    # Sentence structure (0-20 points)
+    if sentence_count >= 3:
+        score += 20
+    elif sentence_count >= 2:
+        score += 10
+    elif sentence_count >= 1:
+        score += 5
+    
+    # Examples/specificity (0-20 points)
+    if has_examples:
+        score += 20
+    
+    # Word diversity bonus (0-20 points) - penalize gibberish
+    if word_diversity > 0.7:
+        score += 20
+    elif word_diversity > 0.5:
+        score += 10
+    elif word_diversity > 0.3:
+        score += 5
+    else:
+        score = max(0, score - 30)  # Heavy penalty for low diversity (gibberish)
+    
+    # Average word length check (gibberish typically has very short words)
+    if avg_word_length < 2:
+        score = max(0, score - 20)
+    
+    # Cap at 100
+    score = min(100, score)
+    
+    return {
+        'score': score,
+        'word_count': word_count,
+        'sentence_count': sentence_count,
+        'has_examples': has_examples,
+        'word_diversity': word_diversity,
+        'avg_word_length': avg_word_length,
+        'relevance': relevance,
+        'relevance_score': relevance_score
+    }
+
+def generate_detailed_feedback(answer, question, analysis, profile=None):
+    """Generate specific, actionable feedback"""
+    feedback_parts = []
+    question_lower = profile.question_lower if profile is not None else question.lower()
+    
+    score = analysis.get('score', 0)
+    word_count = analysis.get('word_count', 0)
+    has_examples = analysis.get('has_examples', False)
+    word_diversity = analysis.get('word_diversity', 0)
+    
+    # Overall quality assessment
+    if score >= 80:
+        feedback_parts.append("Strong response overall.")
+    elif score >= 60:
+        feedback_parts.append("Good foundation, but could be enhanced.")
+    elif score >= 40:
+        feedback_parts.append("Basic answer provided, needs more development.")
+    else:
+        feedback_parts.append("Needs significant improvement.")
+    
+    # Specific critiques and suggestions
+    if word_count == 0:
+        feedback_parts.append("No answer provided. Make sure to respond to every question.")
+    elif word_count < 20:
+        feedback_parts.append(f"Answer is too brief ({word_count} words). Aim for at least 30-50 words to adequately address the question.")
+    elif word_count < 30:
+        feedback_parts.append("Consider expanding your answer with more details and context.")
+    
+    # Check for gibberish/low quality
+    if word_diversity < 0.4 and word_count > 10:
+        feedback_parts.append("⚠️ Your answer appears to contain repetitive or nonsensical content. Focus on providing meaningful, diverse responses.")
+    
+    if analysis.get('avg_word_length', 0) < 2.5 and word_count > 10:
+        feedback_parts.append("⚠️ Answer quality concern detected. Ensure you're using complete, professional language.")
+    
+    # Examples and specificity
+    if not has_examples and score > 0:
+        if "yourself" in question_lower:
+            feedback_parts.append("Include specific details about your background, skills, and relevant experiences.")
+        elif "strengths" in question_lower:
+            feedback_parts.append("Provide concrete examples that demonstrate each strength you mention.")
+        elif "project" in question_lower or "challenge" in question_lower:
+            feedback_parts.append("Use the STAR method (Situation, Task, Action, Result) to structure your response with specific examples.")
+        else:
+            feedback_parts.append("Add specific examples or instances to support your points.")
+    
+    # Relevance to the question; None when the question is too short to judge
+    relevance = analysis.get('relevance')
+    if relevance is not None and word_count > 20 and relevance < 0.1:
+        feedback_parts.append("Connect your answer more directly to what the question asks.")
+    
+    # Structure suggestions
+    if analysis.get('sentence_count', 0) < 2 and word_count > 15:
+        feedback_parts.append("Break your response into multiple sentences for better clarity and flow.")
+    
+    # Positive reinforcement
+    if has_examples:
+        feedback_parts.append("✓ Good use of specific examples.")
+    
+    if word_diversity > 0.7:
+        feedback_parts.append("✓ Diverse vocabulary and well-articulated points.")
+    
+    if analysis.get('sentence_count', 0) >= 3:
+        feedback_parts.append("✓ Well-structured response with multiple points.")
+    
+    if relevance is not None and relevance >= 0.5:
+        feedback_parts.append("✓ Stays focused on the question.")
+    
+    return " ".join(feedback_parts)
+
+def answer_key(answer, question):
+    """Stable key for memoizing the scoring of one answer to one question"""
+    return hashlib.sha256(f"{question}\0{answer}".encode('utf-8')).hexdigest()
+
+
+def score_answer(answer, question):
+    """Analysis and feedback for one answer, from a single profile"""
+    profile = AnswerProfile(answer, question)
+    analysis = analyze_answer_quality(answer, question, profile)
+    return {
+        'score': analysis['score'],
+        'analysis': analysis,
+        'feedback': generate_detailed_feedback(answer, question, analysis, profile)
+    }
+
+
+# Code points str.split() treats as whitespace (none lie above U+3000)
+_IS_WHITESPACE = np.zeros(0x3002, dtype=bool)
+_IS_WHITESPACE[[c for c in range(0x3001) if chr(c).isspace()]] = True
+_PERIOD = ord('.')
+
+
+def _batch_counts(answers):
+    """Per-answer word, distinct-word, letter and sentence counts and example hits.
+
+    Words, letters and sentences are counted with array operations over one
+    UTF-32 buffer holding every answer followed by a newline, one code point
+    per element. Distinct words and example keywords take one C-level pass
+    per answer (a set, and a substring scan per keyword). Counts match
+    AnswerProfile exactly.
+    """
+    answers = [answer or '' for answer in answers]
+    n = len(answers)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty, np.zeros(0, dtype=bool)
+    lengths = np.fromiter(map(len, answers), dtype=np.int64, count=n)
+    starts = np.zeros(n, dtype=np.int64)
+    np.cumsum(lengths[:-1] + 1, out=starts[1:])
+
+    text = np.frombuffer(''.join(answer + '\n' for answer in answers).encode('utf-32-le'), dtype=np.uint32)
+    solid = ~_IS_WHITESPACE[np.minimum(text, len(_IS_WHITESPACE) - 1)]
+    word_start = solid.copy()
+    word_start[1:] &= ~solid[:-1]
+    word_count = np.add.reduceat(word_start, starts, dtype=np.int64)
+    letters = np.add.reduceat(solid, starts, dtype=np.int64)
+
+    # A sentence is a run between periods (or answer edges) holding something besides whitespace
+    period = text == _PERIOD
+    boundary = period.copy()
+    boundary[starts] = True
+    content = solid & ~period
+    segment_starts = np.flatnonzero(boundary)
+    segment_filled = np.add.reduceat(content, segment_starts, dtype=np.int64) > 0
+    segment_owner = np.searchsorted(starts, segment_starts, side='right') - 1
+    sentence_count = np.bincount(segment_owner, weights=segment_filled, minlength=n).astype(np.int64)
+
+    lowered = list(map(str.lower, answers))
+    unique_words = np.fromiter(map(len, map(set, map(str.split, lowered))), dtype=np.int64, count=n)
+    # One substring scan per keyword beats the alternation regex
+    has_examples = np.zeros(n, dtype=bool)
+    for keyword in EXAMPLE_KEYWORDS:
+        has_examples |= np.fromiter(map(str.__contains__, lowered, repeat(keyword)), dtype=bool, count=n)
+    return word_count, unique_words, letters, sentence_count, has_examples
+
+
+def score_batch(answers, questions=None):
+    """Score many answers at once; same results as analyze_answer_quality per answer.
+
+    Returns a dict of arrays: score, word_count, sentence_count,
+    has_examples, word_diversity and avg_word_length, plus relevance when
+    `questions` is given (NaN where the question is too short to judge; it
+    doesn't affect the score).
+    """
+    word_count, unique_words, letters, sentence_count, has_examples = _batch_counts(answers)
+
+    has_words = word_count > 0
+    safe_count = np.where(has_words, word_count, 1)
+    word_diversity = np.where(has_words, unique_words / safe_count, 0.0)
+    avg_word_length = np.where(has_words, letters / safe_count, 0.0)
+
+    score = (np.select([word_count >= 50, word_count >= 30, word_count >= 15, word_count >= 5], [40, 30, 20, 10], 0)
+             + np.select([sentence_count >= 3, sentence_count >= 2, sentence_count >= 1], [20, 10, 5], 0)
+             + np.where(has_examples, 20, 0))
+    score = np.select(
+        [word_diversity > 0.7, word_diversity > 0.5, word_diversity > 0.3],
+        [score + 20, score + 10, score + 5],
+        np.maximum(0, score - 30)
+    )
+    score = np.where(avg_word_length < 2, np.maximum(0, score - 20), score)
+    # Blank answers score 0 whatever their features
+    score = np.where(has_words, np.minimum(100, score), 0)
+
+    features = {
+        'score': score,
+        'word_count': word_count,
+        'sentence_count': sentence_count,
+        'has_examples': has_examples,
+        'word_diversity': word_diversity,
+        'avg_word_length': avg_word_length
+    }
+    if questions is not None:
+        relevances = (answer_relevance.score(question.lower(), (answer or '').lower())[1]
+                      for answer, question in zip(answers, questions))
+        features['relevance'] = np.fromiter(
+            (np.nan if relevance is None else relevance for relevance in relevances),
+            dtype=np.float64, count=len(answers)
+        )
+    return features
+
+
+def calculate_interview_score_batch(answers, questions=None):
+    """Score a whole interview at once: returns (overall score, per-question scores, features)"""
+    features = score_batch(answers, questions)
+    overall_score = int(features['score'].sum()) // len(answers) if len(answers) else 0
+    return overall_score, features['score'], features
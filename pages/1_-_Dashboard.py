@@ -1,57 +1,51 @@
 import streamlit as st
-from google import genai as genai
 import os
-import yaml
+import time
+
+import ai_gateway
+import ai_jobs
+import chat_context
+import chat_window
+import storage
+from user_session import get_user_id
 
 # --- 1. PAGE CONFIG ---
 st.set_page_config(layout="wide", page_title="Fuel My Future", page_icon="🚀")
 
 # --- 2. AI SETUP ---
-try:
-    # Prefer environment variable; fall back to config.yaml for local dev convenience
-    API_KEY = os.environ.get('API_KEY', '')
-    if not API_KEY:
-        with open('config.yaml', 'r') as f:
-            file = yaml.safe_load(f)
-        API_KEY = file.get('API_KEY', '') if file else ''
-
-    # Determine SDK version
-    try:
-        _GENAI_SDK = "google-genai"
-        from google import genai
-    except ImportError:
-        try:
-            _GENAI_SDK = "google-generativeai"
-            import google.generativeai as genai
-        except ImportError:
-            genai = None
-            _GENAI_SDK = None
-
-    if genai is None:
-        st.error("Missing Google AI SDK. Install `google-genai` or `google-generativeai`.")
-        target_model = None
-    elif _GENAI_SDK == "google-genai":
-        # New SDK
-        client = genai.Client(api_key=API_KEY)
-        target_model = 'gemini-3-flash-preview'
-    else:
-        # Old SDK
-        genai.configure(api_key=API_KEY)
-        target_model = 'gemini-3-flash-preview'
-
-except Exception as e:
-    st.error(f"Connection Error: {e}")
+# The Gemini client is shared by the whole process and built on first use
+if ai_gateway.is_available():
+    target_model = ai_gateway.MODEL_NAME
+else:
+    st.error(ai_gateway.init_error())
     target_model = None
 
+CHAT_CHANNEL = "futurebot"
+CHAT_RESTORE_LIMIT = 100
+
 # --- 3. SESSION STATE INITIALIZATION ---
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+# FutureBot keeps its own history; the Resume page uses chat_history for its chat
+if "futurebot_history" not in st.session_state:
+    # Restore the latest FutureBot conversation for this browser
+    st.session_state.futurebot_history = storage.recent_chat_messages(
+        get_user_id(), CHAT_CHANNEL, CHAT_RESTORE_LIMIT
+    )
 if "review_sent" not in st.session_state:
     st.session_state.review_sent = False
 if "it_sent" not in st.session_state:
     st.session_state.it_sent = False
 if "pending_ai_query" not in st.session_state:
     st.session_state.pending_ai_query = None
+if "pending_ai_index" not in st.session_state:
+    st.session_state.pending_ai_index = None
+if "ai_job_id" not in st.session_state:
+    st.session_state.ai_job_id = None
+if "ai_job_prompt" not in st.session_state:
+    st.session_state.ai_job_prompt = None
+if "chat_summary" not in st.session_state:
+    st.session_state.chat_summary = {}
+if "chat_visible" not in st.session_state:
+    st.session_state.chat_visible = chat_window.CHAT_PAGE_SIZE
 
 # --- 4. CUSTOM CSS ---
 st.markdown("""
@@ -286,41 +280,99 @@ st.markdown("""
 
 
 # --- 5. HELPER FUNCTIONS ---
-def get_ai_response(prompt_text):
-    """Get AI response with proper error handling"""
-    try:
-        if _GENAI_SDK == "google-genai":
-            response = client.models.generate_content(
-                model="gemini-3-flash-preview",
-                contents=prompt_text
-            )
-        else:  # google-generativeai
-            model = genai.GenerativeModel("gemini-3-flash-preview")
-            response = model.generate_content(prompt_text)
-        return response.text
-    except Exception as e:
-        return f'❌ Error: {str(e)}'
-
-
-def process_ai_query():
-    """Process pending AI query"""
-    if st.session_state.pending_ai_query and target_model:
-        try:
-            with st.spinner('🤔 AI is thinking...'):
-                answer = get_ai_response(st.session_state.pending_ai_query)
-                st.session_state.chat_history.append({
-                    "role": "assistant",
-                    "content": answer
-                })
-        except Exception as e:
-            st.session_state.chat_history.append({
-                "role": "assistant",
-                "content": f"❌ Error: {str(e)}"
-            })
+def add_chat_message(role, content, **meta):
+    """Append a FutureBot message to the chat and write it to storage"""
+    st.session_state.futurebot_history.append({"role": role, "content": content, **meta})
+    storage.append_chat_message(get_user_id(), CHAT_CHANNEL, role, content, meta)
+
+
+def queue_ai_query(prompt_text):
+    """Add a user message to the chat and mark it as the query to answer next"""
+    st.session_state.pending_ai_index = len(st.session_state.futurebot_history)
+    add_chat_message("user", prompt_text)
+    st.session_state.pending_ai_query = prompt_text
+
+
+# Quick Actions are standalone prompts, so their replies are shared across users
+QUICK_ACTION_PROMPTS = {
+    "Give me 3 career tips for success",
+    "How can I improve my resume?"
+}
+
+
+def process_ai_query(use_cache=True):
+    """Submit the pending AI query as a background streaming job"""
+    if st.session_state.pending_ai_query and target_model and not st.session_state.ai_job_id:
+        prompt_text = st.session_state.pending_ai_query
+        pending_index = st.session_state.pending_ai_index
         st.session_state.pending_ai_query = None
+        st.session_state.pending_ai_index = None
+
+        # Only the turns before the pending query are context for it
+        if pending_index is None:
+            pending_index = len(st.session_state.futurebot_history) - 1
+        earlier_turns = st.session_state.futurebot_history[:pending_index]
+        standalone = prompt_text in QUICK_ACTION_PROMPTS or not earlier_turns
+        use_cache = use_cache and standalone
+
+        # Repeated prompts (e.g. Quick Actions) come straight from the shared cache
+        start = time.perf_counter()
+        cached = ai_gateway.response_cache.get(prompt_text, target_model) if use_cache else None
+        if cached is not None:
+            elapsed = time.perf_counter() - start
+            add_chat_message("assistant", cached, ttft=elapsed, latency=elapsed, cached=True)
+            return
+
+        if standalone:
+            st.session_state.ai_job_id = ai_jobs.submit_stream(ai_gateway.generate_stream, prompt_text)
+        else:
+            # Follow-ups carry a token-budgeted window of the conversation
+            st.session_state.ai_job_id = ai_jobs.submit_stream(
+                chat_context.stream_reply,
+                list(earlier_turns),
+                prompt_text,
+                st.session_state.chat_summary
+            )
+        st.session_state.ai_job_prompt = prompt_text if use_cache else None
 
 
-# Process any pending query
+@st.fragment(run_every=0.5)
+def render_pending_reply():
+    """Show the in-flight reply as it streams in and save it once the job finishes"""
+    job = ai_jobs.get(st.session_state.ai_job_id)
+    if job is None:
+        st.session_state.ai_job_id = None
+        st.rerun()
+
+    if not job.done():
+        with st.chat_message("assistant"):
+            st.markdown(job.partial_text() or "🤔 AI is thinking...")
+        return
+
+    answer = job.result()
+    if st.session_state.ai_job_prompt and answer and not answer.startswith('❌ Error'):
+        ai_gateway.response_cache.put(st.session_state.ai_job_prompt, target_model, answer)
+    if job.stream_value is not None:
+        # Summary refreshed by the worker is stored here, on the script thread
+        st.session_state.chat_summary = job.stream_value
+    add_chat_message("assistant", answer, ttft=job.ttft, latency=job.total)
+    ai_jobs.discard(job.job_id)
+    st.session_state.ai_job_id = None
+    st.session_state.ai_job_prompt = None
+    st.rerun()
+
+
+def format_latency(msg):
+    """Format the recorded time-to-first-token and total latency of a reply"""
+    if msg.get("latency") is None:
+        return None
+    ttft = msg.get("ttft")
+    ttft_text = f"{ttft:.2f}s" if ttft is not None else "n/a"
+    source = " · ⚡ cached" if msg.get("cached") else ""
+    return f"⏱️ First token {ttft_text} · Total {msg['latency']:.2f}s{source}"
+
+
+# Hand any pending query to the background executor before rendering
 process_ai_query()
 
 # --- 6. DASHBOARD LAYOUT ---
@@ -483,7 +535,7 @@ with right_col:
     chat_container = st.container(height=500, border=True)
 
     with chat_container:
-        if len(st.session_state.chat_history) == 0:
+        if len(st.session_state.futurebot_history) == 0:
             st.markdown("""
                 <div style='text-align: center; padding: 40px; color: #64748B;'>
                     <div style='font-size: 3rem; margin-bottom: 15px;'>💬</div>
@@ -492,17 +544,36 @@ with right_col:
                 </div>
             """, unsafe_allow_html=True)
 
-        for msg in st.session_state.chat_history:
+        hidden_count, visible_messages = chat_window.visible_window(
+            st.session_state.futurebot_history, st.session_state.chat_visible
+        )
+        if hidden_count:
+            if st.button(f"⬆️ Load earlier messages ({hidden_count} more)", key="load_earlier_chat",
+                         use_container_width=True):
+                st.session_state.chat_visible += chat_window.CHAT_PAGE_SIZE
+                st.rerun()
+
+        for msg in visible_messages:
             role = msg.get("role", "assistant")
             content = msg.get("content", "")
             with st.chat_message(role):
                 if content:
                     st.markdown(content)
+                latency_text = format_latency(msg)
+                if latency_text:
+                    st.caption(latency_text)
+
+        # Poll the in-flight reply without blocking the rest of the page
+        if st.session_state.ai_job_id:
+            render_pending_reply()
+
+    # One question at a time: replies are saved in order, so wait for the current one
+    reply_pending = bool(st.session_state.ai_job_id)
 
     # Chat input
-    if prompt := st.chat_input("Ask me anything...", key="ai_chat_input"):
-        st.session_state.chat_history.append({"role": "user", "content": prompt})
-        st.session_state.pending_ai_query = prompt
+    if prompt := st.chat_input("Ask me anything...", key="ai_chat_input", disabled=reply_pending):
+        queue_ai_query(prompt)
+        st.session_state.chat_visible = chat_window.CHAT_PAGE_SIZE
         st.rerun()
 
     # Quick action buttons
@@ -511,23 +582,21 @@ with right_col:
     quick_col1, quick_col2 = st.columns(2)
 
     with quick_col1:
-        if st.button("💼 Career Tips", use_container_width=True):
-            st.session_state.chat_history.append({
-                "role": "user",
-                "content": "Give me 3 career tips for success"
-            })
-            st.session_state.pending_ai_query = "Give me 3 career tips for success"
+        if st.button("💼 Career Tips", use_container_width=True, disabled=reply_pending):
+            queue_ai_query("Give me 3 career tips for success")
             st.rerun()
 
     with quick_col2:
-        if st.button("📝 Resume Help", use_container_width=True):
-            st.session_state.chat_history.append({
-                "role": "user",
-                "content": "How can I improve my resume?"
-            })
-            st.session_state.pending_ai_query = "How can I improve my resume?"
+        if st.button("📝 Resume Help", use_container_width=True, disabled=reply_pending):
+            queue_ai_query("How can I improve my resume?")
             st.rerun()
 
     if st.button("🗑️ Clear Chat", use_container_width=True):
-        st.session_state.chat_history = []
+        st.session_state.futurebot_history = []
+        storage.clear_chat(get_user_id(), CHAT_CHANNEL)
+        st.session_state.chat_summary = {}
+        st.session_state.chat_visible = chat_window.CHAT_PAGE_SIZE
+        if st.session_state.ai_job_id:
+            ai_jobs.discard(st.session_state.ai_job_id)
+            st.session_state.ai_job_id = None
         st.rerun()
\ No newline at end of file
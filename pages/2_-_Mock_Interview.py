@@ -1,9 +1,19 @@
 import streamlit as st
+import streamlit.components.v1 as components
 from datetime import datetime
 import time
 
+import storage
+import ai_gateway
+import interview_grading
+import interview_scoring
+import question_bank
+from user_session import get_user_id
+
 st.set_page_config(page_title="Mock Interview", page_icon="📝", layout="wide")
 
+QUESTIONS_PER_INTERVIEW = 5
+
 st.markdown(
     """
     <style>
@@ -50,200 +60,44 @@ if 'questions' not in st.session_state:
 if 'answers' not in st.session_state:
     st.session_state.answers = [''] * len(st.session_state.questions)
 
+# Latest scored answer per question index, as (interview_scoring.answer_key, result)
+if 'answer_results' not in st.session_state:
+    st.session_state.answer_results = {}
+
+# AI grading jobs still running, by question index
+if 'grading_jobs' not in st.session_state:
+    st.session_state.grading_jobs = {}
+
+if 'grading_deadline' not in st.session_state:
+    st.session_state.grading_deadline = None
+
 if 'is_recording' not in st.session_state:
     st.session_state.is_recording = False
 
 if 'timer_start' not in st.session_state:
     st.session_state.timer_start = None
 
+if 'timer_stop' not in st.session_state:
+    st.session_state.timer_stop = None
+
 if 'interview_completed' not in st.session_state:
     st.session_state.interview_completed = False
 
 if 'current_interview_id' not in st.session_state:
     st.session_state.current_interview_id = None
 
-if 'interviews_data' not in st.session_state:
-    st.session_state.interviews_data = []
-
 if 'interview_name' not in st.session_state:
     st.session_state.interview_name = ""
 
 if 'interview_description' not in st.session_state:
     st.session_state.interview_description = ""
 
-# Function to analyze answer quality
-def analyze_answer_quality(answer, question):
-    """Analyze answer quality based on multiple factors"""
-    if not answer or answer.strip() == '':
-        return {
-            'score': 0,
-            'word_count': 0,
-            'sentence_count': 0,
-            'has_examples': False,
-            'relevance': 'none'
-        }
-    
-    # Basic metrics
-    words = answer.split()
-    word_count = len(words)
-    sentences = answer.split('.')
-    sentence_count = len([s for s in sentences if s.strip()])
-    
-    # Check for examples/specifics (STAR method indicators)
-    example_keywords = ['example', 'instance', 'time when', 'situation', 'project', 
-                        'experience', 'specifically', 'resulted in', 'achieved', 'led to']
-    has_examples = any(keyword in answer.lower() for keyword in example_keywords)
-    
-    # Check for repetitive words (gibberish detection)
-    unique_words = len(set(word.lower() for word in words))
-    word_diversity = unique_words / word_count if word_count > 0 else 0
-    
-    # Check for very short repeated words (like "a a a a a")
-    avg_word_length = sum(len(word) for word in words) / word_count if word_count > 0 else 0
-    
-    # Question relevance check (basic)
-    question_keywords = question.lower().split()
-    relevance_score = sum(1 for word in words if word.lower() in question_keywords)
-    
-    # Calculate base score
-    score = 0
-    
-    # Length scoring (0-40 points)
-    if word_count >= 50:
-        score += 40
-    elif word_count >= 30:
-        score += 30
-    elif word_count >= 15:
-        score += 20
-    elif word_count >= 5:
-        score += 10
-    
-    # Sentence structure (0-20 points)
-    if sentence_count >= 3:
-        score += 20
-    elif sentence_count >= 2:
-        score += 10
-    elif sentence_count >= 1:
-        score += 5
-    
-    # Examples/specificity (0-20 points)
-    if has_examples:
-        score += 20
-    
-    # Word diversity bonus (0-20 points) - penalize gibberish
-    if word_diversity > 0.7:
-        score += 20
-    elif word_diversity > 0.5:
-        score += 10
-    elif word_diversity > 0.3:
-        score += 5
-    else:
-        score = max(0, score - 30)  # Heavy penalty for low diversity (gibberish)
-    
-    # Average word length check (gibberish typically has very short words)
-    if avg_word_length < 2:
-        score = max(0, score - 20)
-    
-    # Cap at 100
-    score = min(100, score)
-    
-    return {
-        'score': score,
-        'word_count': word_count,
-        'sentence_count': sentence_count,
-        'has_examples': has_examples,
-        'word_diversity': word_diversity,
-        'avg_word_length': avg_word_length
-    }
-
-# Function to generate detailed feedback
-def generate_detailed_feedback(answer, question, analysis):
-    """Generate specific, actionable feedback"""
-    feedback_parts = []
-    
-    score = analysis.get('score', 0)
-    word_count = analysis.get('word_count', 0)
-    has_examples = analysis.get('has_examples', False)
-    word_diversity = analysis.get('word_diversity', 0)
-    
-    # Overall quality assessment
-    if score >= 80:
-        feedback_parts.append("Strong response overall.")
-    elif score >= 60:
-        feedback_parts.append("Good foundation, but could be enhanced.")
-    elif score >= 40:
-        feedback_parts.append("Basic answer provided, needs more development.")
-    else:
-        feedback_parts.append("Needs significant improvement.")
-    
-    # Specific critiques and suggestions
-    if word_count == 0:
-        feedback_parts.append("No answer provided. Make sure to respond to every question.")
-    elif word_count < 20:
-        feedback_parts.append(f"Answer is too brief ({word_count} words). Aim for at least 30-50 words to adequately address the question.")
-    elif word_count < 30:
-        feedback_parts.append("Consider expanding your answer with more details and context.")
-    
-    # Check for gibberish/low quality
-    if word_diversity < 0.4 and word_count > 10:
-        feedback_parts.append("⚠️ Your answer appears to contain repetitive or nonsensical content. Focus on providing meaningful, diverse responses.")
-    
-    if analysis.get('avg_word_length', 0) < 2.5 and word_count > 10:
-        feedback_parts.append("⚠️ Answer quality concern detected. Ensure you're using complete, professional language.")
-    
-    # Examples and specificity
-    if not has_examples and score > 0:
-        if "yourself" in question.lower():
-            feedback_parts.append("Include specific details about your background, skills, and relevant experiences.")
-        elif "strengths" in question.lower():
-            feedback_parts.append("Provide concrete examples that demonstrate each strength you mention.")
-        elif "project" in question.lower() or "challenge" in question.lower():
-            feedback_parts.append("Use the STAR method (Situation, Task, Action, Result) to structure your response with specific examples.")
-        else:
-            feedback_parts.append("Add specific examples or instances to support your points.")
-    
-    # Structure suggestions
-    if analysis.get('sentence_count', 0) < 2 and word_count > 15:
-        feedback_parts.append("Break your response into multiple sentences for better clarity and flow.")
-    
-    # Positive reinforcement
-    if has_examples:
-        feedback_parts.append("✓ Good use of specific examples.")
-    
-    if word_diversity > 0.7:
-        feedback_parts.append("✓ Diverse vocabulary and well-articulated points.")
-    
-    if analysis.get('sentence_count', 0) >= 3:
-        feedback_parts.append("✓ Well-structured response with multiple points.")
-    
-    return " ".join(feedback_parts)
-
-# Function to calculate interview score
-def calculate_interview_score(answers, questions):
-    """Calculate score based on answer quality analysis"""
-    total_score = 0
-    question_scores = []
-    all_analyses = []
-    
-    for answer, question in zip(answers, questions):
-        analysis = analyze_answer_quality(answer, question)
-        question_scores.append(analysis['score'])
-        all_analyses.append(analysis)
-        total_score += analysis['score']
-    
-    overall_score = total_score // len(answers) if answers else 0
-    return overall_score, question_scores, all_analyses
-
 # Function to save interview feedback
 def save_interview_feedback(interview_id, feedback_data):
-    st.session_state.interview_feedback[interview_id] = feedback_data
-    
-    # Create or update interview in interviews_data
-    existing_index = next((i for i, item in enumerate(st.session_state.interviews_data) 
-                          if item.get('id') == interview_id), None)
+    # Only the interview on screen stays in memory; past ones live in storage
+    st.session_state.interview_feedback = {interview_id: feedback_data}
     
     interview_entry = {
-        'id': interview_id,
         'date': feedback_data['timestamp'].strftime("%Y-%m-%d"),
         'time': feedback_data['timestamp'].strftime("%I:%M %p"),
         'company': feedback_data.get('company', 'Mock Interview'),
@@ -277,17 +131,133 @@ def save_interview_feedback(interview_id, feedback_data):
                 'text': item['feedback']
             })
     
-    if existing_index is not None:
-        st.session_state.interviews_data[existing_index] = interview_entry
+    # Create or update the interview in the results store
+    storage.save_result(get_user_id(), interview_entry, source_key=f"interview-{interview_id}")
+
+# Timer display that ticks in the browser; the server only knows start/stop times
+TIMER_HTML = """
+<style>
+    #timer {{ font: 700 2.25rem "Source Sans Pro", sans-serif; color: #1F2937; margin: 0; }}
+    @media (prefers-color-scheme: dark) {{ #timer {{ color: #E5E7EB; }} }}
+</style>
+<p id="timer"></p>
+<script>
+    const loadedAt = Date.now() - {elapsed_ms};
+    const running = {running};
+    const el = document.getElementById("timer");
+    function tick() {{
+        const total = Math.floor((running ? Date.now() - loadedAt : {elapsed_ms}) / 1000);
+        const pad = (n) => String(n).padStart(2, "0");
+        el.textContent = pad(Math.floor(total / 60)) + ":" + pad(total % 60);
+    }}
+    tick();
+    if (running) setInterval(tick, 1000);
+</script>
+"""
+
+def render_timer():
+    start = st.session_state.timer_start
+    if start is None:
+        elapsed = 0
+    else:
+        elapsed = (st.session_state.timer_stop or time.time()) - start
+    components.html(
+        TIMER_HTML.format(elapsed_ms=int(elapsed * 1000), running='true' if st.session_state.is_recording else 'false'),
+        height=60
+    )
+
+# Score an answer once; saving and submitting reuse the result
+def get_answer_result(i):
+    answer = st.session_state.answers[i]
+    question = st.session_state.questions[i]
+    key = interview_scoring.answer_key(answer, question)
+    cached = st.session_state.answer_results.get(i)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    result = interview_scoring.score_answer(answer, question)
+    # Replaces the result for an earlier version of this answer
+    st.session_state.answer_results[i] = (key, result)
+    return result
+
+# Strengths and areas for improvement from the per-answer analyses and the overall score
+def summarize_performance(analyses, overall_score, confidence_score):
+    strengths = []
+    improvements = []
+
+    answered_count = sum(1 for a in analyses if a['word_count'] > 0)
+
+    if answered_count == len(analyses):
+        strengths.append("Completed all questions")
     else:
-        st.session_state.interviews_data.append(interview_entry)
+        improvements.append(f"Answer all questions ({answered_count}/{len(analyses)} answered)")
+
+    # Check average word diversity (quality indicator)
+    if analyses and len(analyses) > 0:
+        avg_diversity = sum(a.get('word_diversity', 0) for a in analyses) / len(analyses)
+        if avg_diversity > 0.7:
+            strengths.append("High-quality, diverse vocabulary throughout responses")
+        elif avg_diversity < 0.4:
+            improvements.append("Focus on providing meaningful, varied responses (avoid repetition)")
+
+    # Check for use of examples
+    example_count = sum(1 for a in analyses if a.get('has_examples', False))
+    if example_count >= 2:
+        strengths.append("Good use of specific examples and details")
+    elif example_count == 0:
+        improvements.append("Include specific examples using the STAR method (Situation, Task, Action, Result)")
+
+    # Overall score assessment
+    if overall_score >= 80:
+        strengths.append("Strong overall interview performance")
+    elif overall_score >= 60:
+        strengths.append("Solid foundation with room for improvement")
+    elif overall_score < 40:
+        improvements.append("Focus on providing complete, thoughtful answers to each question")
+
+    # Confidence correlation
+    if confidence_score >= 70:
+        strengths.append("High self-confidence")
+    elif confidence_score < 50:
+        improvements.append("Build confidence through more practice and preparation")
+
+    return strengths or ["Keep practicing!"], improvements or ["Continue refining your responses"]
+
+@st.fragment(run_every=1)
+def poll_ai_grading():
+    """Merge AI grades into the results as they arrive"""
+    feedback = st.session_state.interview_feedback.get(st.session_state.current_interview_id, {})
+    jobs = st.session_state.grading_jobs
+    expired = time.time() > st.session_state.grading_deadline
+    pending = interview_grading.collect(jobs, feedback.get('detailed_feedback', []), expired)
+    if len(pending) == len(jobs):
+        graded = sum(1 for item in feedback.get('detailed_feedback', []) if item.get('graded_by') == 'ai')
+        st.info(f"🤖 AI grading in progress... {graded}/{graded + len(pending)} answers graded")
+        return
+
+    st.session_state.grading_jobs = pending
+    scores = [item['score'] for item in feedback['detailed_feedback']]
+    feedback['overall_score'] = sum(scores) // len(scores) if scores else 0
+    # The overall score moved with the AI grades, so the summary has to follow it
+    analyses = [get_answer_result(i)['analysis'] for i in range(len(scores))]
+    feedback['strengths'], feedback['areas_for_improvement'] = summarize_performance(
+        analyses, feedback['overall_score'], feedback['confidence_level']
+    )
+    if not pending:
+        # Keep the AI-graded version in My Results
+        save_interview_feedback(st.session_state.current_interview_id, feedback)
+    st.rerun()
 
 # Function to reset interview
 def reset_interview():
+    interview_grading.cancel(st.session_state.grading_jobs)
+    st.session_state.grading_jobs = {}
+    st.session_state.grading_deadline = None
     st.session_state.current_question = 0
     st.session_state.answers = [''] * len(st.session_state.questions)
+    st.session_state.answer_results = {}
     st.session_state.is_recording = False
     st.session_state.timer_start = None
+    st.session_state.timer_stop = None
     st.session_state.interview_completed = False
     st.session_state.current_interview_id = int(time.time())  # New unique ID
 
@@ -297,11 +267,16 @@ if st.session_state.current_interview_id is None:
 
 # Display Results Page if interview is completed
 if st.session_state.interview_completed:
-    st.balloons()
+    # Only on arrival; grading updates rerun this page
+    if st.session_state.pop('celebrate', False):
+        st.balloons()
     st.success("🎉 Interview Completed!")
     
     # Get the latest feedback
     feedback = st.session_state.interview_feedback.get(st.session_state.current_interview_id, {})
+
+    if st.session_state.grading_jobs:
+        poll_ai_grading()
     
     # Display Results
     st.markdown("## 📊 Your Interview Results")
@@ -348,7 +323,8 @@ if st.session_state.interview_completed:
     st.markdown("### 📝 Question Breakdown")
     
     for i, item in enumerate(feedback.get('detailed_feedback', [])):
-        with st.expander(f"Question {i+1} - Score: {item.get('score', 0)}/100 - {item['question'][:60]}..."):
+        graded_by = " 🤖" if item.get('graded_by') == 'ai' else ""
+        with st.expander(f"Question {i+1} - Score: {item.get('score', 0)}/100{graded_by} - {item['question'][:60]}..."):
             st.write("**Your Answer:**")
             st.info(st.session_state.answers[i] if st.session_state.answers[i] else "No answer provided")
             st.write("**Feedback:**")
@@ -396,6 +372,20 @@ else:
             height=68
         )
 
+    if st.button("🎯 Tailor Questions", help="Draw questions from the question bank that match what you're interviewing for"):
+        try:
+            tailored = question_bank.sample_questions(st.session_state.interview_description, QUESTIONS_PER_INTERVIEW)
+        except Exception as e:
+            tailored = []
+            st.error(f"Could not load the question bank: {str(e)}")
+        if tailored:
+            # Drop the old answer boxes so the new questions start empty
+            for i in range(len(st.session_state.questions)):
+                st.session_state.pop(f"answer_input_{i}", None)
+            st.session_state.questions = tailored
+            reset_interview()
+            st.rerun()
+
     st.markdown("---")
 
     main_left, main_right = st.columns([3, 1])
@@ -416,36 +406,30 @@ else:
                 )
                 if st.button("💾 Save Answer", key=f"save_answer_{i}", use_container_width=True):
                     st.session_state.answers[i] = answer_value
+                    get_answer_result(i)
                     st.success("Answer saved!")
 
     with main_right:
         st.markdown("### ⏱️ Timer")
 
-        if st.session_state.timer_start:
-            elapsed = int(time.time() - st.session_state.timer_start)
-            minutes = elapsed // 60
-            seconds = elapsed % 60
-            st.markdown(f"## {minutes:02d}:{seconds:02d}")
-        else:
-            st.markdown("## 00:00")
+        render_timer()
 
         if not st.session_state.is_recording:
             if st.button("▶️ Start Timer", use_container_width=True):
                 st.session_state.is_recording = True
                 st.session_state.timer_start = time.time()
+                st.session_state.timer_stop = None
                 st.rerun()
         else:
             if st.button("⏸️ Stop Timer", use_container_width=True):
                 st.session_state.is_recording = False
-                st.session_state.timer_start = None
+                st.session_state.timer_stop = time.time()
                 st.rerun()
 
         st.markdown("---")
 
         if st.session_state.is_recording:
             st.success("⏱️ Timer running...")
-            time.sleep(1)
-            st.rerun()
         else:
             st.info("⏱️ Timer stopped")
 
@@ -478,6 +462,12 @@ else:
             max_value=100,
             value=50
         )
+        ai_grading = st.checkbox(
+            "🤖 AI grading",
+            value=False,
+            disabled=not ai_gateway.is_available(),
+            help="Grade each answer with Gemini in parallel; any answer not graded in time keeps its standard score"
+        )
 
     with submit_col3:
         st.write("")
@@ -488,82 +478,49 @@ else:
                 if answer_key in st.session_state:
                     st.session_state.answers[i] = st.session_state[answer_key]
 
-                # Calculate scores with detailed analysis
-                overall_score, question_scores, analyses = calculate_interview_score(
-                    st.session_state.answers, 
-                    st.session_state.questions
+            # Answers were scored when saved; only edits made since are scored now
+            results = [get_answer_result(i) for i in range(len(st.session_state.questions))]
+            analyses = [r['analysis'] for r in results]
+            overall_score = sum(r['score'] for r in results) // len(results) if results else 0
+            
+            strengths, improvements = summarize_performance(analyses, overall_score, confidence_score)
+            
+            # Create detailed feedback for each question
+            detailed_feedback = []
+            for q, result in zip(st.session_state.questions, results):
+                detailed_feedback.append({
+                    'question': q,
+                    'feedback': result['feedback'],
+                    'score': result['score']
+                })
+            
+            # Create feedback data
+            interview_title = st.session_state.interview_name.strip() or "Mock Interview"
+            interview_description = st.session_state.interview_description.strip() or "General Interview"
+            feedback_data = {
+                'overall_score': overall_score,
+                'confidence_level': confidence_score,
+                'company': interview_title,
+                'position': interview_description,
+                'title': interview_title,
+                'strengths': strengths,
+                'areas_for_improvement': improvements,
+                'detailed_feedback': detailed_feedback,
+                'timestamp': datetime.now(),
+                'overall_notes': overall_feedback
+            }
+            
+            # Save the feedback
+            save_interview_feedback(st.session_state.current_interview_id, feedback_data)
+
+            # Heuristic results show at once; AI grades replace them as they arrive
+            if ai_grading:
+                st.session_state.grading_jobs = interview_grading.submit_grading(
+                    st.session_state.questions, st.session_state.answers
                 )
-                
-                # Generate strengths and improvements based on analysis
-                strengths = []
-                improvements = []
-                
-                answered_count = sum(1 for a in st.session_state.answers if a.strip())
-                
-                if answered_count == len(st.session_state.questions):
-                    strengths.append("Completed all questions")
-                else:
-                    improvements.append(f"Answer all questions ({answered_count}/{len(st.session_state.questions)} answered)")
-                
-                # Check average word diversity (quality indicator)
-                if analyses and len(analyses) > 0:
-                    avg_diversity = sum(a.get('word_diversity', 0) for a in analyses) / len(analyses)
-                    if avg_diversity > 0.7:
-                        strengths.append("High-quality, diverse vocabulary throughout responses")
-                    elif avg_diversity < 0.4:
-                        improvements.append("Focus on providing meaningful, varied responses (avoid repetition)")
-                
-                # Check for use of examples
-                example_count = sum(1 for a in analyses if a.get('has_examples', False))
-                if example_count >= 2:
-                    strengths.append("Good use of specific examples and details")
-                elif example_count == 0:
-                    improvements.append("Include specific examples using the STAR method (Situation, Task, Action, Result)")
-                
-                # Overall score assessment
-                if overall_score >= 80:
-                    strengths.append("Strong overall interview performance")
-                elif overall_score >= 60:
-                    strengths.append("Solid foundation with room for improvement")
-                elif overall_score < 40:
-                    improvements.append("Focus on providing complete, thoughtful answers to each question")
-                
-                # Confidence correlation
-                if confidence_score >= 70:
-                    strengths.append("High self-confidence")
-                elif confidence_score < 50:
-                    improvements.append("Build confidence through more practice and preparation")
-                
-                # Create detailed feedback for each question
-                detailed_feedback = []
-                for i, (q, a, analysis) in enumerate(zip(st.session_state.questions, st.session_state.answers, analyses)):
-                    feedback = generate_detailed_feedback(a, q, analysis)
-                    
-                    detailed_feedback.append({
-                        'question': q,
-                        'feedback': feedback,
-                        'score': question_scores[i]
-                    })
-                
-                # Create feedback data
-                interview_title = st.session_state.interview_name.strip() or "Mock Interview"
-                interview_description = st.session_state.interview_description.strip() or "General Interview"
-                feedback_data = {
-                    'overall_score': overall_score,
-                    'confidence_level': confidence_score,
-                    'company': interview_title,
-                    'position': interview_description,
-                    'title': interview_title,
-                    'strengths': strengths if strengths else ["Keep practicing!"],
-                    'areas_for_improvement': improvements if improvements else ["Continue refining your responses"],
-                    'detailed_feedback': detailed_feedback,
-                    'timestamp': datetime.now(),
-                    'overall_notes': overall_feedback
-                }
-                
-                # Save the feedback
-                save_interview_feedback(st.session_state.current_interview_id, feedback_data)
-                
-                # Mark interview as completed
-                st.session_state.interview_completed = True
-                st.rerun()
\ No newline at end of file
+                st.session_state.grading_deadline = interview_grading.deadline()
+            
+            # Mark interview as completed
+            st.session_state.interview_completed = True
+            st.session_state.celebrate = True
+            st.rerun()
\ No newline at end of file
@@ -1,18 +1,8 @@
 import streamlit as st
-from datetime import datetime
 import re
 
-# Helper function to parse dates in multiple formats
-def parse_date(date_string):
-    """Parse date string with support for multiple formats"""
-    formats = ["%m/%d/%y", "%Y-%m-%d", "%m/%d/%Y"]
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_string, fmt)
-        except ValueError:
-            continue
-    # If all formats fail, return a default date
-    return datetime(1970, 1, 1)
+import storage
+from user_session import get_user_id
 
 
 def format_comment_markdown(text):
@@ -42,34 +32,6 @@ def format_comment_markdown(text):
     # Format all items as bulleted lists
     return "\n".join([f"- {item}" for item in cleaned if item])
 
-# Function to load feedback from other pages
-def load_feedback_from_sessions():
-    """
-    Load feedback from mock_interview and resume pages into interviews_data
-    This ensures comments are synced from other pages
-    """
-    if 'interviews_data' not in st.session_state:
-        return
-    # Mock interview feedback
-    if 'interview_feedback' in st.session_state:
-        for interview_id, feedback_data in st.session_state.interview_feedback.items():
-            # Find the interview in interviews_data
-            existing = next((item for item in st.session_state.interviews_data 
-                           if item['id'] == interview_id), None)
-            if existing and feedback_data:
-                # Update score and comments from feedback
-                existing['score'] = feedback_data.get('overall_score', existing['score'])
-    
-    # Resume feedback
-    if 'resume_feedback' in st.session_state:
-        for resume_id, feedback_data in st.session_state.resume_feedback.items():
-            # Find the resume in interviews_data
-            existing = next((item for item in st.session_state.interviews_data 
-                           if item['id'] == resume_id), None)
-            if existing and feedback_data:
-                # Update score and comments from feedback
-                existing['score'] = feedback_data.get('overall_score', existing['score'])
-
 st.set_page_config(page_title="My Results", page_icon="📝", layout="wide")
 
 # Top bar with logo and title
@@ -83,13 +45,6 @@ with col2:
 
 st.markdown("---")
 
-# Load any feedback from other pages
-load_feedback_from_sessions()
-
-# Initialize interviews_data as empty on first load
-if 'interviews_data' not in st.session_state:
-    st.session_state.interviews_data = []
-
 # Helper function to get color based on score
 def get_score_color(score, item_type):
     if score >= 80:
@@ -171,7 +126,7 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state for selected item
+# Initialize session state for selected item (stored by ID, loaded on demand)
 if 'selected_item' not in st.session_state:
     st.session_state.selected_item = None
 
@@ -191,42 +146,34 @@ with control_col3:
 
 st.markdown("<br>", unsafe_allow_html=True)
 
-# Filter data based on selection
-filtered_data = st.session_state.interviews_data.copy()
-
-if filter_option == "Resumes":
-    filtered_data = [item for item in filtered_data if item.get("type") == "resume"]
-elif filter_option == "Interviews":
-    filtered_data = [item for item in filtered_data if item.get("type") == "interview"]
-elif filter_option == "90%+":
-    filtered_data = [item for item in filtered_data if item["score"] >= 90]
-elif filter_option == "80-89%":
-    filtered_data = [item for item in filtered_data if 80 <= item["score"] < 90]
-elif filter_option == "70-79%":
-    filtered_data = [item for item in filtered_data if 70 <= item["score"] < 80]
-elif filter_option == "Below 70%":
-    filtered_data = [item for item in filtered_data if item["score"] < 70]
-
-# Search filter
-if search_query:
-    filtered_data = [
-        item for item in filtered_data
-        if search_query.lower() in item.get("title", "").lower()
-    ]
+# Filter, search and sort in the results store so only matching rows are loaded
+type_filters = {"Resumes": "resume", "Interviews": "interview"}
+score_filters = {
+    "90%+": (90, None),
+    "80-89%": (80, 90),
+    "70-79%": (70, 80),
+    "Below 70%": (None, 70)
+}
+sort_orders = {
+    "Date (Newest)": "newest",
+    "Date (Oldest)": "oldest",
+    "Score (High to Low)": "score_desc",
+    "Score (Low to High)": "score_asc"
+}
+min_score, max_score = score_filters.get(filter_option, (None, None))
 
-# Sort data
-if sort_option == "Date (Newest)":
-    filtered_data.sort(key=lambda x: parse_date(x.get("date", "")), reverse=True)
-elif sort_option == "Date (Oldest)":
-    filtered_data.sort(key=lambda x: parse_date(x.get("date", "")))
-elif sort_option == "Score (High to Low)":
-    filtered_data.sort(key=lambda x: x["score"], reverse=True)
-elif sort_option == "Score (Low to High)":
-    filtered_data.sort(key=lambda x: x["score"])
+filtered_data = storage.list_results(
+    get_user_id(),
+    result_type=type_filters.get(filter_option),
+    min_score=min_score,
+    max_score=max_score,
+    search=search_query or None,
+    order=sort_orders[sort_option]
+)
 
 # Display detail view if an item is selected
-if st.session_state.selected_item is not None:
-    item = st.session_state.selected_item
+item = storage.get_result(get_user_id(), st.session_state.selected_item) if st.session_state.selected_item is not None else None
+if item is not None:
     
     # Header with back button and score
     header_col1, header_col2, header_col3 = st.columns([1, 6, 1])
@@ -265,12 +212,7 @@ if st.session_state.selected_item is not None:
             submit_button = st.form_submit_button("Add Note")
             
             if submit_button and comment_title and comment_text:
-                if "comments" not in item:
-                    item["comments"] = []
-                item["comments"].append({
-                    "title": comment_title,
-                    "text": comment_text
-                })
+                storage.add_comment(get_user_id(), item["id"], comment_title, comment_text)
                 st.success("Note added!")
                 st.rerun()
     
@@ -343,6 +285,6 @@ else:
                         
                         # Button to select this item (hidden, triggered by card area)
                         if st.button(f"View Details", key=f"view_btn_{item['id']}", use_container_width=True):
-                            st.session_state.selected_item = item
+                            st.session_state.selected_item = item['id']
                             st.rerun()
 
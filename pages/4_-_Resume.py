@@ -1,24 +1,19 @@
 import streamlit as st
-from datetime import datetime
-import base64
-import yaml
-import tempfile
 import os
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.colors import HexColor
-from PyPDF2 import PdfReader, PdfWriter
-from google import genai as genai
-
-try:
-    _GENAI_SDK = "google-genai"
-except ImportError:
-    try:
-        _GENAI_SDK = "google-generativeai"
-    except ImportError:
-        genai = None
-        _GENAI_SDK = None
+from datetime import datetime
+
+import ai_gateway
+import ai_jobs
+import ats_check
+import chat_window
+import context_cache
+import pdf_annotations
+import pdf_store
+import quick_prefetch
+import resume_review
+import storage
+import upload_manager
+from user_session import get_session_id, get_user_id
 
 st.set_page_config(page_title="Resume Analyzer", page_icon="📄", layout="wide")
 
@@ -155,26 +150,11 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ========================================
-# LOAD CONFIG AND SETUP CLIENT
+# SETUP CLIENT
 # ========================================
-# Prefer environment variable; fall back to config.yaml for local dev convenience
-API_KEY = os.environ.get('API_KEY', '')
-if not API_KEY:
-    try:
-        with open('config.yaml', 'r') as f:
-            file = yaml.safe_load(f)
-        API_KEY = file.get('API_KEY', '') if file else ''
-    except FileNotFoundError:
-        API_KEY = ''
-client = None
-
-if genai is None:
-    st.error("Missing Google AI SDK. Install `google-genai` or `google-generativeai`.")
-elif hasattr(genai, "Client"):
-    client = genai.Client(api_key=API_KEY)
-else:
-    genai.configure(api_key=API_KEY)
-    client = genai.GenerativeModel("gemini-3-flash-preview")
+# The Gemini client is shared by the whole process and built on first use
+if not ai_gateway.is_available():
+    st.error(ai_gateway.init_error())
 
 # ========================================
 # SESSION STATE
@@ -183,174 +163,116 @@ if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 if 'uploaded_resume' not in st.session_state:
     st.session_state.uploaded_resume = None
-if 'pdf_base64' not in st.session_state:
-    st.session_state.pdf_base64 = None
+if 'pdf_hash' not in st.session_state:
+    st.session_state.pdf_hash = None
 if 'uploaded_file_ref' not in st.session_state:
     st.session_state.uploaded_file_ref = None
 if 'initial_review_done' not in st.session_state:
     st.session_state.initial_review_done = False
 if 'processing' not in st.session_state:
     st.session_state.processing = False
-if 'annotated_pdf' not in st.session_state:
-    st.session_state.annotated_pdf = None
+if 'annotated_pdf_hash' not in st.session_state:
+    st.session_state.annotated_pdf_hash = None
 if 'annotations' not in st.session_state:
     st.session_state.annotations = []
 if 'resume_name' not in st.session_state:
     st.session_state.resume_name = ''
+if 'resume_review' not in st.session_state:
+    st.session_state.resume_review = None
+if 'resume_job_id' not in st.session_state:
+    st.session_state.resume_job_id = None
+if 'resume_job_index' not in st.session_state:
+    st.session_state.resume_job_index = 0
+if 'resume_chat_visible' not in st.session_state:
+    st.session_state.resume_chat_visible = chat_window.CHAT_PAGE_SIZE
 
 
 # ========================================
 # HELPER FUNCTIONS
 # ========================================
-def get_ai_response(prompt_text):
-    """Get AI response with proper error handling"""
-    try:
-        if _GENAI_SDK == "google-genai":
-            response = client.models.generate_content(
-                model="gemini-3-flash-preview",
-                contents=[
-                    st.session_state.uploaded_file_ref,
-                    prompt_text
-                ]
-            )
-        else:  # google-generativeai
-            response = client.generate_content([
-                st.session_state.uploaded_file_ref,
-                prompt_text
-            ])
-        return response.text
-    except Exception as e:
-        return f'❌ Error: {str(e)}'
-
-
-def create_annotated_pdf(original_pdf_bytes, annotations):
-    """Create a PDF with annotations overlay"""
+def next_pending_question():
+    """Index of the oldest question that has no answer yet, or None"""
+    history = st.session_state.chat_history
+    for idx, message in enumerate(history):
+        if message.get('type') == 'user' and (idx + 1 == len(history) or history[idx + 1].get('type') != 'ai'):
+            return idx
+    return None
+
+
+def submit_resume_query(prompt_text, follow_up=False, answer_index=None):
+    """Run a question about the uploaded resume in the background.
+
+    The answer is inserted into the chat at `answer_index` (default: the end).
+
+    Follow-up questions reference the cached resume context, or send only
+    the relevant extracted sections as text when there is no live cache;
+    quick questions wait on their prefetch if it is still running. The
+    initial review still sends the whole file.
+    """
+    if follow_up:
+        st.session_state.resume_job_id = ai_jobs.submit(
+            quick_prefetch.answer,
+            st.session_state.uploaded_file_ref,
+            st.session_state.pdf_hash,
+            prompt_text
+        )
+    else:
+        st.session_state.resume_job_id = ai_jobs.submit(
+            ai_gateway.get_ai_response,
+            [st.session_state.uploaded_file_ref, prompt_text]
+        )
+    if answer_index is None:
+        answer_index = len(st.session_state.chat_history)
+    st.session_state.resume_job_index = answer_index
+
+
+def cancel_resume_query():
+    """Forget any in-flight resume question"""
+    if st.session_state.resume_job_id:
+        ai_jobs.discard(st.session_state.resume_job_id)
+    st.session_state.resume_job_id = None
+
+
+@st.fragment(run_every=1)
+def poll_resume_query():
+    """Wait for the in-flight resume question and add its answer to the chat"""
+    job = ai_jobs.get(st.session_state.resume_job_id)
+    if job is not None and not job.done():
+        return
+
+    ai_response = job.result() if job else '❌ Error: The AI request expired, please try again.'
+    if isinstance(ai_response, dict):
+        # Structured initial review
+        st.session_state.resume_review = ai_response['review']
+        ai_response = ai_response['content']
+        if st.session_state.resume_review:
+            # Annotations came back with the review; no second AI call needed
+            st.session_state.annotations = resume_review.overlay_annotations(st.session_state.resume_review)
+            if st.session_state.annotations:
+                st.session_state.annotated_pdf_hash = create_annotated_pdf(st.session_state.annotations)
+    # Answer sits right after its question, ahead of anything asked meanwhile
+    st.session_state.chat_history.insert(st.session_state.resume_job_index, {
+        'type': 'ai',
+        'content': ai_response
+    })
+    cancel_resume_query()
+
+    # Keep processing if more questions were queued while this one ran
+    st.session_state.processing = next_pending_question() is not None
+    st.rerun()
+
+
+def create_annotated_pdf(annotations):
+    """Create the annotated copy of the uploaded resume and return its PDF store hash"""
     try:
-        # Read original PDF
-        original_pdf = PdfReader(io.BytesIO(original_pdf_bytes))
-        output_pdf = PdfWriter()
-
-        for page_num in range(len(original_pdf.pages)):
-            page = original_pdf.pages[page_num]
-
-            # Create annotation overlay
-            packet = io.BytesIO()
-            can = canvas.Canvas(packet, pagesize=letter)
-
-            # Get page dimensions
-            page_width = float(page.mediabox.width)
-            page_height = float(page.mediabox.height)
-
-            # Filter annotations for this page
-            page_annotations = [a for a in annotations if a.get('page', 0) == page_num]
-
-            # Add annotations to overlay
-            y_position = page_height - 50
-            for idx, annotation in enumerate(page_annotations):
-                # Draw comment box
-                comment_text = annotation.get('text', '')
-                x_pos = annotation.get('x', 400)
-
-                # Set colors and fonts
-                can.setFillColor(HexColor('#FBBF24'))
-                can.setStrokeColor(HexColor('#F59E0B'))
-                can.setLineWidth(2)
-
-                # Draw rounded rectangle
-                box_width = 180
-                box_height = 60
-                can.roundRect(x_pos, y_position - box_height, box_width, box_height, 5, fill=1, stroke=1)
-
-                # Add text
-                can.setFillColor(HexColor('#0F172A'))
-                can.setFont("Helvetica-Bold", 8)
-                can.drawString(x_pos + 5, y_position - 15, f"💡 AI Feedback #{idx + 1}")
-
-                can.setFont("Helvetica", 7)
-                # Wrap text
-                words = comment_text.split()
-                lines = []
-                current_line = []
-                for word in words[:15]:  # Limit to first 15 words
-                    current_line.append(word)
-                    if len(' '.join(current_line)) > 25:
-                        lines.append(' '.join(current_line[:-1]))
-                        current_line = [word]
-                if current_line:
-                    lines.append(' '.join(current_line))
-
-                for i, line in enumerate(lines[:3]):  # Max 3 lines
-                    can.drawString(x_pos + 5, y_position - 30 - (i * 10), line)
-
-                y_position -= 80
-
-            can.save()
-
-            # Merge overlay with original page
-            packet.seek(0)
-            overlay_pdf = PdfReader(packet)
-            page.merge_page(overlay_pdf.pages[0])
-            output_pdf.add_page(page)
-
-        # Write to bytes
-        output_bytes = io.BytesIO()
-        output_pdf.write(output_bytes)
-        output_bytes.seek(0)
-
-        return output_bytes.getvalue()
-
+        return pdf_annotations.annotate(st.session_state.pdf_hash, annotations)
     except Exception as e:
         st.error(f"Error creating annotated PDF: {str(e)}")
         return None
 
 
-def generate_annotations_from_ai():
-    """Get AI to generate specific annotations for resume sections"""
-    prompt = """Please analyze this resume and provide specific feedback for different sections. 
-
-For each major issue or improvement area, provide:
-1. The section it applies to (e.g., "Summary", "Experience", "Skills", "Education")
-2. A brief comment (max 10 words)
-
-Format your response as a numbered list like:
-1. Summary - Too generic, add specific achievements
-2. Experience - Quantify results with metrics
-3. Skills - Add industry-specific keywords
-4. Education - Include relevant coursework
-
-Provide 4-6 specific comments."""
-
-    response = get_ai_response(prompt)
-
-    # Parse response into annotations
-    annotations = []
-    lines = response.strip().split('\n')
-
-    y_positions = [720, 600, 480, 360, 240, 120]  # Different vertical positions
-
-    for idx, line in enumerate(lines[:6]):
-        if line.strip() and any(char.isdigit() for char in line[:3]):
-            # Extract comment text (remove number prefix)
-            comment = line.split('.', 1)[-1].strip() if '.' in line else line.strip()
-
-            annotations.append({
-                'page': 0,  # Assume single page for now
-                'x': 400,
-                'y': y_positions[idx] if idx < len(y_positions) else 100,
-                'text': comment
-            })
-
-    return annotations
-
-
 def save_to_my_uploads(resume_file):
     """Save resume to My Uploads"""
-    if 'all_docs' not in st.session_state:
-        st.session_state.all_docs = []
-
-    existing_ids = [doc.get('id') for doc in st.session_state.all_docs if isinstance(doc.get('id'), int)]
-    new_id = max(existing_ids, default=0) + 1
-
     feedback_summary = None
     for message in reversed(st.session_state.chat_history):
         if message.get('type') == 'ai' and message.get('content'):
@@ -365,133 +287,37 @@ def save_to_my_uploads(resume_file):
         tldr_text = f"AI analyzed resume - uploaded {datetime.now().strftime('%m/%d/%Y')}"
 
     new_doc = {
-        'id': new_id,
         'title': resume_file.name.replace('.pdf', ''),
         'date': datetime.now().strftime('%Y-%m-%d'),
         'type': 'Resume',
         'tldr': tldr_text
     }
 
-    st.session_state.all_docs.append(new_doc)
+    storage.save_document(get_user_id(), 'resume', new_doc)
     return True
 
 
 def save_to_results():
     """Save resume analysis to My Results with comments"""
-    # Check if there's AI feedback
-    ai_messages = [m for m in st.session_state.chat_history if m.get('type') == 'ai']
-    if not ai_messages:
+    # The structured initial review is required; its fields become the comments
+    review = st.session_state.resume_review
+    if not review:
         return False
-    
-    # Initialize interviews_data if not exists
-    if 'interviews_data' not in st.session_state:
-        st.session_state.interviews_data = []
-    
-    # Get existing IDs to generate new one
-    existing_ids = [item.get('id') for item in st.session_state.interviews_data if isinstance(item.get('id'), int)]
-    new_id = max(existing_ids, default=0) + 1
-    
-    # Extract AI feedback as comments
-    comments = []
-    
-    # Get the first AI message (initial review)
-    if ai_messages:
-        initial_feedback = ai_messages[0].get('content', '')
-        
-        # Try to parse the feedback into sections
-        sections = {
-            "score": None,
-            "strengths": [],
-            "improvements": [],
-            "ats_tips": [],
-            "recommendations": []
-        }
-        
-        # Look for score in the feedback
-        import re
-        score_match = re.search(r'(?:score|rating)[\s:]*(\d+(?:\.\d+)?)[/\s]?(?:10|out of 10)?', initial_feedback, re.IGNORECASE)
-        if score_match:
-            sections["score"] = int(float(score_match.group(1)) * 10)  # Convert to percentage
-        else:
-            sections["score"] = 85  # Default score
-        
-        # Split feedback into lines for processing
-        lines = initial_feedback.split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            lower_line = line.lower()
-            if 'strength' in lower_line or 'strong' in lower_line:
-                current_section = 'strengths'
-            elif 'improvement' in lower_line or 'improve' in lower_line or 'weakness' in lower_line:
-                current_section = 'improvements'
-            elif 'ats' in lower_line or 'keyword' in lower_line:
-                current_section = 'ats_tips'
-            elif 'recommend' in lower_line or 'next step' in lower_line or 'suggestion' in lower_line:
-                current_section = 'recommendations'
-            elif line.startswith(('•', '-', '*', '1.', '2.', '3.', '4.', '5.')) and current_section:
-                # Clean bullet point
-                clean_line = re.sub(r'^[•\-*\d.]+\s*', '', line)
-                if current_section and clean_line:
-                    sections[current_section].append(clean_line)
-        
-        # Build comments from sections
-        if sections["score"]:
-            comments.append({
-                "title": "📊 Overall Score",
-                "text": f"Score: {sections['score']}%"
-            })
-        
-        if sections["strengths"]:
-            comments.append({
-                "title": "✅ Strengths",
-                "text": '\n'.join([f"• {s}" for s in sections["strengths"][:5]])
-            })
-        
-        if sections["improvements"]:
-            comments.append({
-                "title": "⚠️ Areas for Improvement",
-                "text": '\n'.join([f"• {i}" for i in sections["improvements"][:5]])
-            })
-        
-        if sections["ats_tips"]:
-            comments.append({
-                "title": "🎯 ATS Optimization",
-                "text": '\n'.join([f"• {a}" for a in sections["ats_tips"][:5]])
-            })
-        
-        if sections["recommendations"]:
-            comments.append({
-                "title": "💡 Recommendations",
-                "text": '\n'.join([f"• {r}" for r in sections["recommendations"][:5]])
-            })
-        
-        # If we couldn't parse sections, just save the full feedback
-        if len(comments) <= 1:
-            comments = [{
-                "title": "📝 AI Feedback",
-                "text": initial_feedback[:500]  # Limit length
-            }]
-    
+
     # Get resume name or use default
     resume_title = st.session_state.resume_name if st.session_state.resume_name else st.session_state.uploaded_resume.name.replace('.pdf', '')
-    
+
     # Create new result entry
     new_result = {
-        "id": new_id,
         "title": resume_title,
         "type": "resume",
         "date": datetime.now().strftime('%m/%d/%y'),
-        "score": sections.get("score", 85),
+        "score": review['score'],
         "content": "",
-        "comments": comments
+        "comments": resume_review.review_comments(review)
     }
-    
-    st.session_state.interviews_data.append(new_result)
+
+    storage.save_result(get_user_id(), new_result)
     return True
 
 
@@ -527,7 +353,8 @@ if st.session_state.uploaded_resume is None:
 
     if uploaded_file is not None:
         st.session_state.uploaded_resume = uploaded_file
-        st.session_state.pdf_base64 = base64.b64encode(uploaded_file.read()).decode('utf-8')
+        # Keep the bytes once in the PDF store; the session only holds their hash
+        st.session_state.pdf_hash = pdf_store.put_stream(uploaded_file)
         st.session_state.chat_history.append({
             'type': 'system',
             'content': f'📁 Resume uploaded: {uploaded_file.name}'
@@ -578,20 +405,31 @@ else:
 
     with button_col3:
         if st.button("🔄 Upload New Resume", use_container_width=True):
+            cancel_resume_query()
+            if st.session_state.pdf_hash:
+                quick_prefetch.cancel(st.session_state.pdf_hash, get_session_id())
+                context_cache.release(st.session_state.pdf_hash, get_session_id())
+            st.session_state.processing = False
             st.session_state.uploaded_resume = None
             st.session_state.chat_history = []
-            st.session_state.pdf_base64 = None
+            st.session_state.resume_chat_visible = chat_window.CHAT_PAGE_SIZE
+            st.session_state.pdf_hash = None
             st.session_state.uploaded_file_ref = None
             st.session_state.initial_review_done = False
-            st.session_state.annotated_pdf = None
+            st.session_state.resume_review = None
+            st.session_state.annotated_pdf_hash = None
             st.session_state.annotations = []
             st.session_state.resume_name = ''
             st.rerun()
 
     with button_col4:
         if st.button("🗑️ Clear Chat", use_container_width=True):
+            cancel_resume_query()
+            st.session_state.processing = False
             st.session_state.chat_history = []
+            st.session_state.resume_chat_visible = chat_window.CHAT_PAGE_SIZE
             st.session_state.initial_review_done = False
+            st.session_state.resume_review = None
             st.rerun()
 
     st.markdown("---")
@@ -604,7 +442,7 @@ else:
         st.markdown("### 📄 Resume Preview")
 
         # Toggle between original and annotated
-        if st.session_state.annotated_pdf:
+        if st.session_state.annotated_pdf_hash:
             view_option = st.radio(
                 "View:",
                 ["Original Resume", "With AI Comments"],
@@ -613,46 +451,45 @@ else:
             )
 
             if view_option == "With AI Comments":
-                pdf_to_display = st.session_state.annotated_pdf
+                pdf_to_display = st.session_state.annotated_pdf_hash
 
                 # Download button for annotated PDF
                 st.download_button(
                     label="⬇️ Download Annotated PDF",
-                    data=base64.b64decode(st.session_state.annotated_pdf),
+                    data=pdf_annotations.output_bytes(st.session_state.annotated_pdf_hash) or b'',
                     file_name="resume_with_ai_comments.pdf",
                     mime="application/pdf",
                     use_container_width=True
                 )
             else:
-                pdf_to_display = st.session_state.pdf_base64
+                pdf_to_display = st.session_state.pdf_hash
         else:
-            pdf_to_display = st.session_state.pdf_base64
+            pdf_to_display = st.session_state.pdf_hash
 
-        if st.session_state.pdf_base64:
+        if st.session_state.pdf_hash:
             # Upload the file to Gemini ONCE when first loaded
             if st.session_state.uploaded_file_ref is None:
                 with st.spinner("Uploading PDF to Gemini AI..."):
                     try:
-                        # Save base64 to temporary file
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                            tmp_file.write(base64.b64decode(st.session_state.pdf_base64))
-                            tmp_path = tmp_file.name
-
-                        # Upload to Gemini based on SDK version
-                        if _GENAI_SDK == "google-genai":
-                            uploaded_file = client.files.upload(file=tmp_path)
-                        else:  # google-generativeai
-                            uploaded_file = genai.upload_file(path=tmp_path)
+                        # Reuse a live upload of the same PDF, otherwise upload it
+                        # Stream the in-memory upload straight to the SDK
+                        uploaded_file, reused = upload_manager.get_or_upload(
+                            st.session_state.uploaded_resume, digest=st.session_state.pdf_hash
+                        )
 
                         st.session_state.uploaded_file_ref = uploaded_file
 
-                        # Clean up temp file
-                        try:
-                            os.unlink(tmp_path)
-                        except:
-                            pass
-
-                        st.success("✅ PDF uploaded to Gemini AI")
+                        if reused:
+                            st.success("✅ Reusing previously uploaded PDF")
+                        else:
+                            st.success("✅ PDF uploaded to Gemini AI")
+                        # Register the resume as cached context for follow-ups, off the script thread
+                        context_cache.hold(st.session_state.pdf_hash, get_session_id())
+                        ai_jobs.submit(context_cache.register, st.session_state.pdf_hash,
+                                       st.session_state.uploaded_file_ref)
+                        # Most users click the quick questions next; start answering them now
+                        quick_prefetch.start(st.session_state.uploaded_file_ref, st.session_state.pdf_hash,
+                                             get_session_id())
                         st.session_state.chat_history.append({
                             'type': 'system',
                             'content': '✅ PDF ready for AI analysis'
@@ -668,14 +505,30 @@ else:
                             'content': f'❌ Upload failed: {str(e)}'
                         })
 
-            # Display PDF
-            pdf_display = f'<iframe src="data:application/pdf;base64,{pdf_to_display}" class="pdf-viewer" type="application/pdf"></iframe>'
+            # Display PDF by URL so reruns don't resend the document
+            pdf_display = f'<iframe src="{pdf_store.url_for(pdf_to_display)}" class="pdf-viewer" type="application/pdf"></iframe>'
             st.markdown(pdf_display, unsafe_allow_html=True)
         else:
             st.info("No PDF to display")
 
     # CHAT INTERFACE
     with chat_col:
+        # Local pre-check, shown before the AI review arrives
+        if st.session_state.pdf_hash:
+            ats = ats_check.check(st.session_state.pdf_hash)
+            if ats:
+                with st.expander(f"⚡ Instant ATS Check: {ats['score']}/100", expanded=not st.session_state.resume_review):
+                    metric_col1, metric_col2, metric_col3 = st.columns(3)
+                    metric_col1.metric("Bullets", f"{ats['bullet_density']:.0%}")
+                    metric_col2.metric("Quantified", f"{ats['quantified_ratio']:.0%}")
+                    metric_col3.metric("Action verbs", f"{ats['action_verb_ratio']:.0%}")
+                    st.caption(
+                        f"Sections found: {', '.join(ats['sections_found']) or 'none'} · "
+                        f"Skills backed by experience: {ats['skill_coverage']:.0%}"
+                    )
+                    for tip in ats['tips']:
+                        st.markdown(f"- {tip}")
+
         st.markdown("### 💬 AI Assistant")
 
         # Display messages container
@@ -684,15 +537,19 @@ else:
         with chat_container:
             st.markdown("<div class='chat-messages'>", unsafe_allow_html=True)
 
-            for message in st.session_state.chat_history:
-                msg_type = message.get('type', 'system')
-                msg_content = message.get('content', '')
-                if msg_type == 'user':
-                    st.markdown(f"<div class='user-message'>👤 {msg_content}</div>", unsafe_allow_html=True)
-                elif msg_type == 'ai':
-                    st.markdown(f"<div class='ai-message'>🤖 {msg_content}</div>", unsafe_allow_html=True)
-                elif msg_type == 'system':
-                    st.markdown(f"<div class='system-message'>{msg_content}</div>", unsafe_allow_html=True)
+            hidden_count, visible_messages = chat_window.visible_window(
+                st.session_state.chat_history, st.session_state.resume_chat_visible
+            )
+            if hidden_count:
+                if st.button(f"⬆️ Load earlier messages ({hidden_count} more)", key="load_earlier_resume_chat",
+                             use_container_width=True):
+                    st.session_state.resume_chat_visible += chat_window.CHAT_PAGE_SIZE
+                    st.rerun()
+
+            for message in visible_messages:
+                message_html = chat_window.message_html(message.get('type', 'system'), message.get('content', ''))
+                if message_html:
+                    st.markdown(message_html, unsafe_allow_html=True)
 
             # Show thinking indicator if processing
             if st.session_state.processing:
@@ -717,27 +574,14 @@ else:
             st.rerun()
 
         # Process initial review
-        if st.session_state.processing and st.session_state.initial_review_done and len(
+        if st.session_state.processing and st.session_state.initial_review_done and not st.session_state.resume_job_id and len(
                 [m for m in st.session_state.chat_history if m.get('type') == 'ai']) == 0:
-            initial_prompt = """Please provide a comprehensive review of this resume including:
-
-1. Overall impression and score (1-10)
-2. Key strengths
-3. Areas for improvement
-4. ATS optimization suggestions
-5. Recommended next steps
-
-Please be specific and actionable in your feedback."""
-
-            ai_response = get_ai_response(initial_prompt)
-
-            st.session_state.chat_history.append({
-                'type': 'ai',
-                'content': ai_response
-            })
-
-            st.session_state.processing = False
-            st.rerun()
+            st.session_state.resume_job_id = ai_jobs.submit(
+                resume_review.request_review,
+                st.session_state.uploaded_file_ref,
+                st.session_state.pdf_hash
+            )
+            st.session_state.resume_job_index = len(st.session_state.chat_history)
 
         # Chat input
         user_input = st.text_input(
@@ -756,63 +600,62 @@ Please be specific and actionable in your feedback."""
 
             # Set processing flag
             st.session_state.processing = True
+            st.session_state.resume_chat_visible = chat_window.CHAT_PAGE_SIZE
             st.rerun()
 
-        # Process user query if we're in processing state
-        if st.session_state.processing and len(st.session_state.chat_history) > 0 and st.session_state.chat_history[-1].get('type') == 'user':
-            last_user_message = st.session_state.chat_history[-1].get('content', '')
+        # Answer queued questions one at a time, oldest first
+        pending_index = next_pending_question() if st.session_state.processing and not st.session_state.resume_job_id else None
+        if pending_index is not None:
+            pending_question = st.session_state.chat_history[pending_index].get('content', '')
 
-            if st.session_state.uploaded_file_ref:
-                ai_response = get_ai_response(last_user_message)
-
-                st.session_state.chat_history.append({
+            prefetched = quick_prefetch.ready(st.session_state.pdf_hash, pending_question)
+            if prefetched:
+                st.session_state.chat_history.insert(pending_index + 1, {
                     'type': 'ai',
-                    'content': ai_response
+                    'content': prefetched
                 })
+                st.session_state.processing = next_pending_question() is not None
+                st.rerun()
+            elif st.session_state.uploaded_file_ref:
+                submit_resume_query(pending_question, follow_up=True, answer_index=pending_index + 1)
             else:
-                st.session_state.chat_history.append({
+                st.session_state.chat_history.insert(pending_index + 1, {
                     'type': 'ai',
                     'content': '❌ Please wait for the PDF to finish uploading to Gemini AI.'
                 })
+                st.session_state.processing = next_pending_question() is not None
+                st.rerun()
 
-            st.session_state.processing = False
-            st.rerun()
+        # Collect the background answer without blocking the page
+        if st.session_state.resume_job_id:
+            poll_resume_query()
 
         # Quick questions
         st.markdown("### 🎯 Quick Questions")
 
-        quick_col1, quick_col2 = st.columns(2)
-
-        with quick_col1:
-            if st.button("💪 Strengths", use_container_width=True):
-                st.session_state.chat_history.append({
-                    'type': 'user',
-                    'content': 'What are the key strengths in my resume?'
-                })
-                st.session_state.processing = True
-                st.rerun()
-
-            if st.button("📈 Improvements", use_container_width=True):
-                st.session_state.chat_history.append({
-                    'type': 'user',
-                    'content': 'How can I improve my resume?'
-                })
-                st.session_state.processing = True
-                st.rerun()
-
-        with quick_col2:
-            if st.button("🎯 ATS Tips", use_container_width=True):
-                st.session_state.chat_history.append({
-                    'type': 'user',
-                    'content': 'What are your ATS optimization tips?'
-                })
-                st.session_state.processing = True
-                st.rerun()
-
-            if st.button("📊 Score", use_container_width=True):
-                st.session_state.chat_history.append({
-                    'type': 'user',
-                    'content': 'What is my resume score?'
-                })
-                st.session_state.processing = True
-                st.rerun()
\ No newline at end of file
+        quick_cols = st.columns(2)
+
+        for idx, (label, prompt) in enumerate(quick_prefetch.QUICK_QUESTIONS.items()):
+            with quick_cols[idx // 2]:
+                if st.button(label, use_container_width=True):
+                    st.session_state.chat_history.append({
+                        'type': 'user',
+                        'content': prompt
+                    })
+                    st.session_state.processing = True
+                    st.rerun()
+
+        # Cache counters for tuning, shown when FMF_SHOW_CACHE_STATS is set
+        if os.environ.get('FMF_SHOW_CACHE_STATS'):
+            with st.expander("📈 Cache stats"):
+                prefetch = quick_prefetch.stats()
+                responses = ai_gateway.response_cache.stats()
+                st.caption(
+                    f"Quick-question prefetch: {prefetch['hits']} hits · {prefetch['misses']} misses · "
+                    f"hit rate {prefetch['hit_rate']:.0%} · {prefetch['wasted']} of "
+                    f"{prefetch['prefetched']} calls wasted ({prefetch['wasted_rate']:.0%})"
+                )
+                st.caption(
+                    f"Response cache: {responses['size']} entries · {responses['hits']} hits · "
+                    f"{responses['misses']} misses · hit rate {responses['hit_rate']:.0%}"
+                )
@@ -1,14 +1,15 @@
 import streamlit as st
 from datetime import datetime
 
+import storage
+from user_session import get_user_id
+
 # 1. PAGE CONFIG
 st.set_page_config(page_title="Document Hub", page_icon="📂", layout="wide")
 
-# 2. SESSION STATE INITIALIZATION
-if 'all_docs' not in st.session_state:
-    st.session_state.all_docs = []
-if 'other_docs' not in st.session_state:
-    st.session_state.other_docs = []
+# 2. USER
+# Documents live in the shared store; each tab loads only the rows it shows
+user_id = get_user_id()
 
 # 3. STYLING
 st.markdown("""
@@ -71,17 +72,16 @@ with tab1:
                                    ["All Documents"])
 
     # LOGIC
+    sort_orders = {
+        "Most to Least Recent": "newest",
+        "Least to Most Recent": "oldest",
+        "Alphabetical (A-Z)": "title"
+    }
+    resume_docs = storage.list_documents(user_id, 'resume', order=sort_orders[sort_option])
     if type_filter == "All Documents":
-        filtered = [d for d in st.session_state.all_docs if d.get("type") == "Resume"]
-    else:
-        filtered = [d for d in st.session_state.all_docs if d.get("type") == type_filter]
-
-    if sort_option == "Alphabetical (A-Z)":
-        filtered = sorted(filtered, key=lambda x: x["title"])
-    elif sort_option == "Most to Least Recent":
-        filtered = sorted(filtered, key=lambda x: x["date"], reverse=True)
+        filtered = [d for d in resume_docs if d.get("type") == "Resume"]
     else:
-        filtered = sorted(filtered, key=lambda x: x["date"])
+        filtered = [d for d in resume_docs if d.get("type") == type_filter]
 
     st.write("##")
 
@@ -120,7 +120,7 @@ with tab1:
                                 st.session_state[sum_key] = not st.session_state[sum_key];
                                 st.rerun()
                             if st.button("🗑️ Remove", key=f"d_{i}_{doc['title']}", use_container_width=True):
-                                st.session_state.all_docs.remove(doc);
+                                storage.delete_document(user_id, doc['id']);
                                 st.rerun()
 
                     date_obj = datetime.strptime(doc['date'], "%Y-%m-%d")
@@ -137,7 +137,7 @@ with tab1:
                     if st.session_state[ren_key]:
                         new_n = st.text_input("New Name:", value=doc['title'], key=f"in_{i}_{doc['title']}")
                         if st.button("Confirm", key=f"sv_{i}_{doc['title']}"):
-                            doc['title'] = new_n;
+                            storage.rename_document(user_id, doc['id'], new_n);
                             st.session_state[ren_key] = False;
                             st.rerun()
 
@@ -165,8 +165,8 @@ with tab1:
             st.write("Select two documents to see specific improvements in your professional voice.")
             # FIXED: Added '2' to st.columns
             ca, cb = st.columns(2)
-            with ca: d1 = st.selectbox("Old Document", [d['title'] for d in st.session_state.all_docs], key="c1")
-            with cb: d2 = st.selectbox("New Document", [d['title'] for d in st.session_state.all_docs], key="c2")
+            with ca: d1 = st.selectbox("Old Document", [d['title'] for d in resume_docs], key="c1")
+            with cb: d2 = st.selectbox("New Document", [d['title'] for d in resume_docs], key="c2")
 
             if st.button("Compare Improvements"):
                 st.success(f"Comparison Complete: '{d1}' vs '{d2}'")
@@ -224,8 +224,8 @@ with tab2:
                     "tldr": f"Uploaded on {datetime.now().strftime('%m/%d/%Y')}"
                 }
                 
-                # Add to session state
-                st.session_state.other_docs.append(new_doc)
+                # Write to the document store
+                storage.save_document(user_id, 'other', new_doc)
                 
                 st.success("✅ Document saved successfully!")
                 st.balloons()
@@ -252,7 +252,7 @@ with tab2:
     }
     
     # Display all other documents in grid layout
-    all_docs_sorted = sorted(st.session_state.other_docs, key=lambda x: x["date"], reverse=True)
+    all_docs_sorted = storage.list_documents(user_id, 'other', order='newest')
     rows = [all_docs_sorted[i:i + 3] for i in range(0, len(all_docs_sorted), 3)]
 
     for row_idx, row in enumerate(rows):
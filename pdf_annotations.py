@@ -0,0 +1,151 @@
+"""Overlay engine that draws AI feedback boxes onto a resume PDF.
+
+Annotations are grouped by page once, pages without annotations are copied
+untouched, and all overlays are drawn on a single ReportLab canvas. Finished
+output is cached per (PDF hash, annotation set hash), so toggling the
+annotated view or downloading again costs nothing.
+"""
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict, defaultdict
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.colors import HexColor
+from PyPDF2 import PdfReader, PdfWriter
+
+import pdf_store
+
+MAX_CACHED_OUTPUTS = 32
+
+BOX_WIDTH = 180
+BOX_HEIGHT = 60
+BOX_SPACING = 80
+
+_rendered = OrderedDict()   # (pdf hash, annotations hash) -> annotated PDF hash
+_output_bytes = OrderedDict()   # annotated PDF hash -> bytes
+_lock = threading.Lock()
+
+
+def annotations_hash(annotations):
+    payload = json.dumps(annotations, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def group_by_page(annotations):
+    """Map page number -> annotations on that page, in one pass"""
+    pages = defaultdict(list)
+    for annotation in annotations:
+        pages[annotation.get('page', 0)].append(annotation)
+    return pages
+
+
+def _wrap(comment_text):
+    """Split a comment into at most 3 short lines"""
+    words = comment_text.split()
+    lines = []
+    current_line = []
+    for word in words[:15]:  # Limit to first 15 words
+        current_line.append(word)
+        if len(' '.join(current_line)) > 25:
+            lines.append(' '.join(current_line[:-1]))
+            current_line = [word]
+    if current_line:
+        lines.append(' '.join(current_line))
+    return lines[:3]  # Max 3 lines
+
+
+def _draw_page(can, page_height, page_annotations):
+    y_position = page_height - 50
+    for idx, annotation in enumerate(page_annotations):
+        x_pos = annotation.get('x', 400)
+
+        # Draw comment box
+        can.setFillColor(HexColor('#FBBF24'))
+        can.setStrokeColor(HexColor('#F59E0B'))
+        can.setLineWidth(2)
+        can.roundRect(x_pos, y_position - BOX_HEIGHT, BOX_WIDTH, BOX_HEIGHT, 5, fill=1, stroke=1)
+
+        # Add text
+        can.setFillColor(HexColor('#0F172A'))
+        can.setFont("Helvetica-Bold", 8)
+        can.drawString(x_pos + 5, y_position - 15, f"💡 AI Feedback #{idx + 1}")
+
+        can.setFont("Helvetica", 7)
+        for i, line in enumerate(_wrap(annotation.get('text', ''))):
+            can.drawString(x_pos + 5, y_position - 30 - (i * 10), line)
+
+        y_position -= BOX_SPACING
+    can.showPage()
+
+
+def render(original_pdf_bytes, annotations):
+    """Return the PDF bytes with annotation overlays merged in"""
+    original_pdf = PdfReader(io.BytesIO(original_pdf_bytes))
+    by_page = group_by_page(annotations)
+    annotated_pages = [n for n in range(len(original_pdf.pages)) if by_page.get(n)]
+
+    # One canvas holds the overlay for every annotated page
+    overlays = {}
+    if annotated_pages:
+        packet = io.BytesIO()
+        can = canvas.Canvas(packet, pagesize=letter)
+        for page_num in annotated_pages:
+            page_height = float(original_pdf.pages[page_num].mediabox.height)
+            _draw_page(can, page_height, by_page[page_num])
+        can.save()
+        packet.seek(0)
+        overlay_pdf = PdfReader(packet)
+        overlays = dict(zip(annotated_pages, overlay_pdf.pages))
+
+    output_pdf = PdfWriter()
+    for page_num, page in enumerate(original_pdf.pages):
+        if page_num in overlays:
+            page.merge_page(overlays[page_num])
+        output_pdf.add_page(page)
+
+    output_bytes = io.BytesIO()
+    output_pdf.write(output_bytes)
+    return output_bytes.getvalue()
+
+
+def _remember(cache, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > MAX_CACHED_OUTPUTS:
+        cache.popitem(last=False)
+
+
+def annotate(pdf_hash, annotations):
+    """Return the hash of the annotated PDF in the PDF store, rendering it only once"""
+    key = (pdf_hash, annotations_hash(annotations))
+    with _lock:
+        annotated_hash = _rendered.get(key)
+    if annotated_hash and pdf_store.exists(annotated_hash):
+        return annotated_hash
+
+    original_pdf_bytes = pdf_store.get(pdf_hash)
+    if original_pdf_bytes is None:
+        raise FileNotFoundError("Stored PDF has expired, please upload it again")
+    annotated_bytes = render(original_pdf_bytes, annotations)
+    annotated_hash = pdf_store.put(annotated_bytes)
+    with _lock:
+        _remember(_rendered, key, annotated_hash)
+        _remember(_output_bytes, annotated_hash, annotated_bytes)
+    return annotated_hash
+
+
+def output_bytes(annotated_hash):
+    """Bytes of an annotated PDF, served from memory when possible"""
+    with _lock:
+        data = _output_bytes.get(annotated_hash)
+        if data is not None:
+            _output_bytes.move_to_end(annotated_hash)
+            return data
+    data = pdf_store.get(annotated_hash)
+    if data is not None:
+        with _lock:
+            _remember(_output_bytes, annotated_hash, data)
+    return data
@@ -0,0 +1,106 @@
+"""Content-addressed store for PDF bytes, served as static files.
+
+Each PDF is written once under `static/pdfs/<sha256>.pdf` and shown through
+Streamlit's static file server, so session state only holds the hash and a
+rerun only sends a short URL instead of the base64-encoded document.
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+import upload_manager
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'pdfs')
+STATIC_URL = 'app/static/pdfs'
+
+# Stored PDFs not touched for this long are removed when new ones arrive
+PDF_TTL_SECONDS = 7 * 24 * 3600
+
+
+def path_for(digest):
+    return os.path.join(STATIC_DIR, f'{digest}.pdf')
+
+
+def url_for(digest):
+    """Relative URL the browser can load the PDF from"""
+    return f'{STATIC_URL}/{digest}.pdf'
+
+
+def prune():
+    """Remove stored PDFs older than PDF_TTL_SECONDS"""
+    cutoff = time.time() - PDF_TTL_SECONDS
+    try:
+        entries = list(os.scandir(STATIC_DIR))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def put(pdf_bytes, digest=None):
+    """Store PDF bytes once and return their content hash"""
+    digest = digest or upload_manager.content_hash(pdf_bytes)
+    path = path_for(digest)
+    if os.path.exists(path):
+        os.utime(path)
+        return digest
+
+    prune()
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    # Write then rename so the static server never serves a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=STATIC_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return digest
+
+
+def put_stream(fileobj):
+    """Store a file-like object, hashing it in the same pass as the write"""
+    prune()
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    hasher = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=STATIC_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in upload_manager.iter_hashed_chunks(fileobj, hasher):
+                f.write(chunk)
+        digest = hasher.hexdigest()
+        if os.path.exists(path_for(digest)):
+            os.unlink(tmp_path)
+            os.utime(path_for(digest))
+        else:
+            os.replace(tmp_path, path_for(digest))
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return digest
+
+
+def exists(digest):
+    """Whether the PDF for a hash is still stored, without reading it"""
+    return os.path.exists(path_for(digest))
+
+
+def get(digest):
+    """Return the stored bytes for a hash, or None if they are gone"""
+    try:
+        with open(path_for(digest), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,264 @@
+"""Interview question bank with an inverted tag index.
+
+Questions are compiled from a JSONL source (one object per line with
+"text", "roles", "seniority", "skills" and "category") into a compact
+directory:
+
+    texts.bin      UTF-8 question texts back to back
+    offsets.npy    uint64 start of each text in texts.bin (n + 1 entries)
+    seniority.npy  uint8 seniority code per question
+    postings.npy   int32 question ids grouped by tag
+    tags.json      tag ("role:...", "seniority:...", "skill:...",
+                   "category:...") -> [start, count] in postings.npy
+
+Nothing is read at import. The first sample loads tags.json and
+memory-maps the arrays; only the texts of the k questions drawn are read,
+so a bank of tens of thousands of questions costs nothing at startup.
+
+    python question_bank.py build questions.jsonl -o data/question_bank
+"""
+import argparse
+import json
+import mmap
+import os
+import random
+import re
+import sys
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SOURCE_PATH = os.path.join(DATA_DIR, 'interview_questions.jsonl')
+
+# Compiled bank to use; built from SOURCE_PATH when it is the default and missing or stale
+BANK_DIR = os.environ.get('FMF_QUESTION_BANK', os.path.join(DATA_DIR, 'question_bank'))
+
+SENIORITY_LEVELS = ['any', 'entry', 'mid', 'senior']
+SENIORITY_WORDS = {
+    'intern': 'entry', 'internship': 'entry', 'junior': 'entry', 'jr': 'entry', 'entry': 'entry',
+    'graduate': 'entry', 'grad': 'entry', 'student': 'entry',
+    'mid': 'mid', 'intermediate': 'mid',
+    'senior': 'senior', 'sr': 'senior', 'lead': 'senior', 'staff': 'senior',
+    'principal': 'senior', 'head': 'senior',
+}
+
+# Phrases people type -> tag values used in the bank
+ALIASES = {
+    'developer': 'software engineer', 'software developer': 'software engineer',
+    'programmer': 'software engineer', 'swe': 'software engineer', 'sde': 'software engineer',
+    'engineer': 'software engineer', 'backend': 'software engineer', 'frontend': 'software engineer',
+    'full stack': 'software engineer', 'web developer': 'software engineer',
+    'data science': 'data scientist', 'ml': 'machine learning', 'ai': 'machine learning',
+    'business analyst': 'data analyst',
+    'pm': 'product manager',
+    'ux': 'designer', 'ui': 'designer', 'product designer': 'designer',
+    'cashier': 'retail', 'store': 'retail', 'sales associate': 'retail',
+    'restaurant': 'food service', 'barista': 'food service', 'server': 'food service',
+    'fast food': 'food service', 'chick fil a': 'food service', 'crew member': 'food service',
+    'support': 'customer service', 'call center': 'customer service',
+    'finance': 'financial analyst', 'accountant': 'financial analyst',
+    'teaching': 'teacher', 'tutor': 'teacher', 'nursing': 'nurse', 'rn': 'nurse',
+    'js': 'javascript', 'postgres': 'sql', 'mysql': 'sql',
+}
+
+MAX_PHRASE_WORDS = 3
+
+# Draws per requested question before giving up on finding unseen ones
+MAX_DRAW_ATTEMPTS = 8
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_TAG_KINDS = ('role', 'skill', 'category')
+
+_lock = threading.Lock()
+_bank = None
+
+
+def _normalize(value):
+    return ' '.join(_WORD_RE.findall(value.lower()))
+
+
+def _question_tags(question):
+    # Questions for no particular role are indexed under role:any
+    tags = {f"role:{_normalize(r)}" for r in question.get('roles', [])} or {'role:any'}
+    tags.update(f"skill:{_normalize(s)}" for s in question.get('skills', []))
+    tags.add(f"category:{_normalize(question.get('category', 'general'))}")
+    tags.add(f"seniority:{question.get('seniority', 'any')}")
+    return tags
+
+
+def build(source_path, out_dir):
+    """Compile a JSONL question source into the on-disk bank format"""
+    os.makedirs(out_dir, exist_ok=True)
+    offsets = [0]
+    seniority = []
+    postings = defaultdict(list)
+    with open(source_path, 'r', encoding='utf-8') as src, \
+            open(os.path.join(out_dir, 'texts.bin.tmp'), 'wb') as texts:
+        for line in src:
+            if not line.strip():
+                continue
+            question = json.loads(line)
+            qid = len(seniority)
+            encoded = question['text'].strip().encode('utf-8')
+            texts.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+            level = question.get('seniority', 'any')
+            seniority.append(SENIORITY_LEVELS.index(level) if level in SENIORITY_LEVELS else 0)
+            for tag in _question_tags(question):
+                postings[tag].append(qid)
+
+    tags = {}
+    flat = []
+    for tag in sorted(postings):
+        tags[tag] = [len(flat), len(postings[tag])]
+        flat.extend(postings[tag])
+
+    np.save(os.path.join(out_dir, 'offsets.npy'), np.asarray(offsets, dtype=np.uint64))
+    np.save(os.path.join(out_dir, 'seniority.npy'), np.asarray(seniority, dtype=np.uint8))
+    np.save(os.path.join(out_dir, 'postings.npy'), np.asarray(flat, dtype=np.int32))
+    with open(os.path.join(out_dir, 'tags.json'), 'w', encoding='utf-8') as f:
+        json.dump(tags, f)
+    # texts.bin last, so a half-built bank is never mistaken for a fresh one
+    os.replace(os.path.join(out_dir, 'texts.bin.tmp'), os.path.join(out_dir, 'texts.bin'))
+    return len(seniority)
+
+
+class QuestionBank:
+    """Read-only view of a compiled bank; files are opened on first use"""
+
+    def __init__(self, path):
+        self.path = path
+        self._tags = None
+        self._offsets = None
+        self._seniority = None
+        self._postings = None
+        self._texts = None
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        if self._tags is not None:
+            return
+        with self._load_lock:
+            if self._tags is not None:
+                return
+            self._offsets = np.load(os.path.join(self.path, 'offsets.npy'), mmap_mode='r')
+            self._seniority = np.load(os.path.join(self.path, 'seniority.npy'), mmap_mode='r')
+            self._postings = np.load(os.path.join(self.path, 'postings.npy'), mmap_mode='r')
+            with open(os.path.join(self.path, 'texts.bin'), 'rb') as f:
+                self._texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+            with open(os.path.join(self.path, 'tags.json'), 'r', encoding='utf-8') as f:
+                self._tags = json.load(f)
+
+    def __len__(self):
+        self._load()
+        return len(self._seniority)
+
+    def text(self, qid):
+        self._load()
+        start, end = int(self._offsets[qid]), int(self._offsets[qid + 1])
+        return self._texts[start:end].decode('utf-8')
+
+    def match_tags(self, description):
+        """Bank tags mentioned in free text, plus the seniority it implies (or None)"""
+        self._load()
+        words = _WORD_RE.findall(description.lower())
+        matched = []
+        seniority = None
+        for size in range(MAX_PHRASE_WORDS, 0, -1):
+            for i in range(len(words) - size + 1):
+                phrase = ' '.join(words[i:i + size])
+                if size == 1 and phrase in SENIORITY_WORDS and seniority is None:
+                    seniority = SENIORITY_WORDS[phrase]
+                value = ALIASES.get(phrase, phrase)
+                for kind in _TAG_KINDS:
+                    tag = f"{kind}:{value}"
+                    if tag in self._tags and tag not in matched:
+                        matched.append(tag)
+        return matched, seniority
+
+    def sample(self, description, k=5, rng=None):
+        """Draw k distinct questions matching a description in O(k) expected time.
+
+        Draws rotate between the posting lists of the roles, skills and
+        categories mentioned plus the role-independent questions, and
+        prefer questions at the implied seniority.
+        """
+        self._load()
+        rng = rng or random.Random()
+        n = len(self._seniority)
+        if n == 0:
+            return []
+        tags, seniority = self.match_tags(description)
+        # General questions are always in the mix
+        tags.append('role:any')
+        pools = [self._tags[tag] for tag in tags if tag in self._tags] or [[None, n]]
+        # Without a stated level, prefer questions that don't assume a senior candidate
+        preferred_levels = {0, SENIORITY_LEVELS.index(seniority)} if seniority else {0, 1, 2}
+
+        chosen = []
+        seen = set()
+        max_attempts = min(k, n) * MAX_DRAW_ATTEMPTS
+        for attempt in range(max_attempts):
+            if len(chosen) >= k:
+                break
+            start, count = pools[attempt % len(pools)]
+            offset = rng.randrange(count)
+            qid = offset if start is None else int(self._postings[start + offset])
+            if qid in seen:
+                continue
+            # Off-level questions are only taken in the second half of the attempts
+            if int(self._seniority[qid]) not in preferred_levels and attempt < max_attempts // 2:
+                continue
+            seen.add(qid)
+            chosen.append(qid)
+        return [self.text(qid) for qid in chosen]
+
+
+def _stale(bank_dir, source_path):
+    try:
+        return os.path.getmtime(os.path.join(bank_dir, 'texts.bin')) < os.path.getmtime(source_path)
+    except FileNotFoundError:
+        return True
+
+
+def get_bank():
+    """Return the process-wide bank, compiling the bundled source first if needed"""
+    global _bank
+    if _bank is None:
+        with _lock:
+            if _bank is None:
+                if 'FMF_QUESTION_BANK' not in os.environ and _stale(BANK_DIR, SOURCE_PATH):
+                    build(SOURCE_PATH, BANK_DIR)
+                _bank = QuestionBank(BANK_DIR)
+    return _bank
+
+
+def sample_questions(description, k=5):
+    """k interview questions tailored to a "What are you interviewing for?" description"""
+    return get_bank().sample(description, k)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the interview question bank.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build_parser = sub.add_parser('build', help="Compile a JSONL question source")
+    build_parser.add_argument('source', nargs='?', default=SOURCE_PATH, help="JSONL question source")
+    build_parser.add_argument('-o', '--output', default=BANK_DIR, help="Output bank directory")
+    sample_parser = sub.add_parser('sample', help="Draw questions for a description")
+    sample_parser.add_argument('description')
+    sample_parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        count = build(args.source, args.output)
+        print(f"Built {count} questions into {args.output}", file=sys.stderr)
+    else:
+        for question in sample_questions(args.description, args.k):
+            print(question)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
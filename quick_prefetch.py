@@ -0,0 +1,153 @@
+"""Speculative prefetch of the Resume page quick-question answers.
+
+The quick-question prompts are fixed, so once a resume is uploaded they are
+sent in the background on a small dedicated pool. Answers are kept per
+resume hash; clicking a button then shows a finished answer at once, or
+waits on the in-flight call instead of issuing a second one. stats()
+reports the hit rate and how many prefetched calls were never used.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import context_cache
+
+# Button label -> prompt sent to the model
+QUICK_QUESTIONS = OrderedDict([
+    ("💪 Strengths", "What are the key strengths in my resume?"),
+    ("📈 Improvements", "How can I improve my resume?"),
+    ("🎯 ATS Tips", "What are your ATS optimization tips?"),
+    ("📊 Score", "What is my resume score?"),
+])
+QUICK_PROMPTS = frozenset(QUICK_QUESTIONS.values())
+
+# Prefetch gets its own small pool so it never delays questions users actually asked
+MAX_PREFETCH_WORKERS = 4
+MAX_PREFETCHED_RESUMES = 32
+
+_executor = ThreadPoolExecutor(max_workers=MAX_PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_entries = OrderedDict()   # pdf hash -> {prompt: _Prefetch}
+_owners = {}   # pdf hash -> sessions that started or joined its prefetch
+_lock = threading.Lock()
+_counters = {'prefetched': 0, 'hits': 0, 'misses': 0, 'wasted': 0}
+
+
+class _Prefetch:
+    __slots__ = ('future', 'used')
+
+    def __init__(self, future):
+        self.future = future
+        self.used = False
+
+
+def _fetch(file_ref, pdf_hash, prompt):
+    # Reuses the resume's context cache when it can be created
+    context_cache.register(pdf_hash, file_ref)
+    return context_cache.ask(file_ref, pdf_hash, prompt)
+
+
+def _usable(answer):
+    return bool(answer) and not answer.startswith('❌')
+
+
+def _retire(entries):
+    """Cancel pending calls and count finished ones nobody used"""
+    for entry in entries.values():
+        if entry.future.cancel():
+            _counters['prefetched'] -= 1
+        elif not entry.used:
+            _counters['wasted'] += 1
+
+
+def start(file_ref, pdf_hash, owner):
+    """Prefetch every quick-question answer for a freshly uploaded resume.
+
+    `owner` identifies the session (user_session.get_session_id()); sessions
+    uploading the same resume share one prefetch.
+    """
+    with _lock:
+        _owners.setdefault(pdf_hash, set()).add(owner)
+        if pdf_hash in _entries:
+            _entries.move_to_end(pdf_hash)
+            return
+        _entries[pdf_hash] = {
+            prompt: _Prefetch(_executor.submit(_fetch, file_ref, pdf_hash, prompt))
+            for prompt in QUICK_QUESTIONS.values()
+        }
+        _counters['prefetched'] += len(QUICK_QUESTIONS)
+        while len(_entries) > MAX_PREFETCHED_RESUMES:
+            evicted, entries = _entries.popitem(last=False)
+            _owners.pop(evicted, None)
+            _retire(entries)
+
+
+def cancel(pdf_hash, owner):
+    """Leave a resume's prefetch; it is stopped and dropped once no session is left.
+
+    Sessions that end without cancelling leave it to LRU eviction.
+    """
+    with _lock:
+        owners = _owners.get(pdf_hash)
+        if owners:
+            owners.discard(owner)
+            if owners:
+                return
+        _owners.pop(pdf_hash, None)
+        entries = _entries.pop(pdf_hash, None)
+        if entries:
+            _retire(entries)
+
+
+def _claim(pdf_hash, prompt):
+    with _lock:
+        entry = _entries.get(pdf_hash, {}).get(prompt)
+        if entry is not None:
+            entry.used = True
+        return entry
+
+
+def ready(pdf_hash, prompt):
+    """Return the finished prefetched answer for a quick question, or None"""
+    with _lock:
+        entry = _entries.get(pdf_hash, {}).get(prompt)
+    if entry is None or not entry.future.done() or entry.future.cancelled():
+        return None
+    answer = entry.future.result() if entry.future.exception() is None else None
+    if not _usable(answer):
+        return None
+    with _lock:
+        entry.used = True
+        _counters['hits'] += 1
+    return answer
+
+
+def answer(file_ref, pdf_hash, prompt):
+    """Answer a question, waiting on its prefetch instead of calling again when there is one.
+
+    Runs on a background job.
+    """
+    if prompt not in QUICK_PROMPTS:
+        return context_cache.ask(file_ref, pdf_hash, prompt)
+    entry = _claim(pdf_hash, prompt)
+    if entry is not None and not entry.future.cancelled():
+        try:
+            result = entry.future.result()
+        except Exception:
+            result = None
+        if _usable(result):
+            with _lock:
+                _counters['hits'] += 1
+            return result
+    with _lock:
+        _counters['misses'] += 1
+    return context_cache.ask(file_ref, pdf_hash, prompt)
+
+
+def stats():
+    """Prefetch counters with hit rate (of quick-question clicks) and wasted-call rate"""
+    with _lock:
+        counters = dict(_counters)
+    clicks = counters['hits'] + counters['misses']
+    counters['hit_rate'] = counters['hits'] / clicks if clicks else 0.0
+    counters['wasted_rate'] = counters['wasted'] / counters['prefetched'] if counters['prefetched'] else 0.0
+    return counters
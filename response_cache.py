@@ -0,0 +1,69 @@
+"""Bounded, process-wide cache for AI replies to repeated prompts.
+
+Entries are keyed on the normalized prompt plus the model name, evicted
+least-recently-used once the cache is full, and expire after a TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt_text):
+    """Collapse case and whitespace so trivially different prompts share a key"""
+    return ' '.join(prompt_text.lower().split())
+
+
+class ResponseCache:
+    """LRU + TTL cache of prompt -> reply text"""
+
+    def __init__(self, max_entries=256, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, prompt_text, model):
+        return (model, normalize_prompt(prompt_text))
+
+    def get(self, prompt_text, model):
+        """Return the cached reply, or None on a miss or expired entry"""
+        key = self._key(prompt_text, model)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, prompt_text, model, reply_text):
+        """Store a reply, evicting the least recently used entries if full"""
+        key = self._key(prompt_text, model)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, reply_text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return size and hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
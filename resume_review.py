@@ -0,0 +1,168 @@
+"""Structured initial resume review.
+
+The review is requested as JSON matching REVIEW_SCHEMA, validated locally
+and kept as typed fields. Saving to My Results then just copies fields;
+nothing is scraped back out of free-form text.
+
+One request returns the review, the score and the per-section annotations
+drawn onto the PDF, and the result is cached per resume content hash.
+"""
+import threading
+from collections import OrderedDict
+
+import ai_gateway
+
+MAX_CACHED_REVIEWS = 128
+MAX_ANNOTATIONS = 6
+
+# Vertical positions of the annotation boxes on the first page
+ANNOTATION_Y_POSITIONS = [720, 600, 480, 360, 240, 120]
+
+REVIEW_PROMPT = """Please provide a comprehensive review of this resume including:
+
+1. Overall impression and a score from 0 to 100
+2. Key strengths
+3. Areas for improvement
+4. ATS optimization suggestions
+5. Recommended next steps
+6. 4-6 annotations, each naming the resume section it applies to (e.g. "Summary",
+   "Experience", "Skills", "Education") with a brief comment of at most 10 words
+
+Please be specific and actionable in your feedback. Keep each list item to one sentence."""
+
+LIST_FIELDS = ['strengths', 'improvements', 'ats_tips', 'recommendations']
+
+REVIEW_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'overall_impression': {'type': 'STRING'},
+        'score': {'type': 'INTEGER', 'minimum': 0, 'maximum': 100},
+        **{field: {'type': 'ARRAY', 'items': {'type': 'STRING'}} for field in LIST_FIELDS},
+        'annotations': {
+            'type': 'ARRAY',
+            'items': {
+                'type': 'OBJECT',
+                'properties': {
+                    'section': {'type': 'STRING'},
+                    'comment': {'type': 'STRING'}
+                },
+                'required': ['section', 'comment']
+            }
+        }
+    },
+    'required': ['overall_impression', 'score', 'annotations'] + LIST_FIELDS
+}
+
+_reviews = OrderedDict()
+_lock = threading.Lock()
+
+# (field, My Results tab title, chat heading)
+FIELD_TITLES = [
+    ('strengths', '✅ Strengths', '💪 Key Strengths'),
+    ('improvements', '⚠️ Areas for Improvement', '📈 Areas for Improvement'),
+    ('ats_tips', '🎯 ATS Optimization', '🎯 ATS Optimization'),
+    ('recommendations', '💡 Recommendations', '💡 Recommended Next Steps'),
+]
+
+
+def validate_review(data):
+    """Check and normalize a review returned by the model; raises ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError("Review is not a JSON object")
+    try:
+        score = int(round(float(data.get('score'))))
+    except (TypeError, ValueError):
+        raise ValueError("Review has no numeric score")
+    review = {
+        'overall_impression': str(data.get('overall_impression', '')).strip(),
+        'score': max(0, min(100, score))
+    }
+    for field in LIST_FIELDS:
+        items = data.get(field) or []
+        if not isinstance(items, list):
+            raise ValueError(f"Review field '{field}' is not a list")
+        review[field] = [str(item).strip() for item in items if str(item).strip()]
+
+    annotations = data.get('annotations') or []
+    if not isinstance(annotations, list):
+        raise ValueError("Review field 'annotations' is not a list")
+    review['annotations'] = [
+        {'section': str(a.get('section', '')).strip(), 'comment': str(a.get('comment', '')).strip()}
+        for a in annotations if isinstance(a, dict) and str(a.get('comment', '')).strip()
+    ][:MAX_ANNOTATIONS]
+    return review
+
+
+def overlay_annotations(review):
+    """Annotation boxes for create_annotated_pdf, built from the review"""
+    annotations = []
+    for idx, item in enumerate(review.get('annotations', [])):
+        text = f"{item['section']} - {item['comment']}" if item['section'] else item['comment']
+        annotations.append({
+            'page': 0,  # Assume single page for now
+            'x': 400,
+            'y': ANNOTATION_Y_POSITIONS[idx] if idx < len(ANNOTATION_Y_POSITIONS) else 100,
+            'text': text
+        })
+    return annotations
+
+
+def format_review(review):
+    """Markdown shown in the chat for a structured review"""
+    parts = [f"**Overall score: {review['score']}/100**", review['overall_impression']]
+    for field, _, heading in FIELD_TITLES:
+        if review[field]:
+            parts.append(f"**{heading}**\n" + "\n".join(f"- {item}" for item in review[field]))
+    return "\n\n".join(part for part in parts if part)
+
+
+def review_comments(review):
+    """My Results comments built straight from the review fields"""
+    comments = [{
+        "title": "📊 Overall Score",
+        "text": f"Score: {review['score']}%"
+    }]
+    for field, title, _ in FIELD_TITLES:
+        if review[field]:
+            comments.append({
+                "title": title,
+                "text": '\n'.join(f"• {item}" for item in review[field][:5])
+            })
+    return comments
+
+
+def cached_review(pdf_hash):
+    with _lock:
+        review = _reviews.get(pdf_hash)
+        if review is not None:
+            _reviews.move_to_end(pdf_hash)
+        return review
+
+
+def _remember(pdf_hash, review):
+    with _lock:
+        _reviews[pdf_hash] = review
+        while len(_reviews) > MAX_CACHED_REVIEWS:
+            _reviews.popitem(last=False)
+
+
+def run_review(file_ref, pdf_hash=None):
+    """Return the validated review for an uploaded resume; raises on failure"""
+    review = cached_review(pdf_hash) if pdf_hash else None
+    if review is None:
+        review = validate_review(ai_gateway.generate_json([file_ref, REVIEW_PROMPT], REVIEW_SCHEMA))
+        if pdf_hash:
+            _remember(pdf_hash, review)
+    return review
+
+
+def request_review(file_ref, pdf_hash=None):
+    """Run the initial review and annotations in one call, cached per resume hash.
+
+    Returns {'content': chat text, 'review': fields or None}.
+    """
+    try:
+        review = run_review(file_ref, pdf_hash)
+    except Exception as e:
+        return {'content': f'❌ Error: {str(e)}', 'review': None}
+    return {'content': format_review(review), 'review': review}
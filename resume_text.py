@@ -0,0 +1,135 @@
+"""Local resume text extraction and section index.
+
+The text of each resume is pulled out with PyPDF2 once per content hash and
+split into sections (Summary, Experience, Skills, Education, ...). Follow-up
+questions then send only the sections they need as plain text instead of
+making Gemini re-parse the whole PDF on every call.
+"""
+import io
+import re
+import threading
+from collections import OrderedDict
+
+from PyPDF2 import PdfReader
+
+import ai_gateway
+import pdf_store
+
+MAX_CACHED_RESUMES = 64
+
+# Below this much text the PDF is probably scanned; send the file instead
+MIN_TEXT_CHARS = 200
+
+SECTION_HEADINGS = {
+    'Summary': ['summary', 'professional summary', 'profile', 'objective', 'about me'],
+    'Experience': ['experience', 'work experience', 'professional experience',
+                   'employment', 'employment history', 'work history'],
+    'Skills': ['skills', 'technical skills', 'core competencies', 'competencies'],
+    'Education': ['education', 'academic background'],
+    'Projects': ['projects', 'personal projects'],
+    'Certifications': ['certifications', 'certificates', 'licenses'],
+    'Awards': ['awards', 'honors', 'achievements'],
+}
+
+_HEADING_RE = re.compile(
+    r'^\s*(' + '|'.join(sorted(
+        (re.escape(h) for names in SECTION_HEADINGS.values() for h in names),
+        key=len, reverse=True
+    )) + r')\s*:?\s*$',
+    re.IGNORECASE
+)
+_HEADING_TO_SECTION = {h: name for name, names in SECTION_HEADINGS.items() for h in names}
+
+# Which sections a question needs, by keyword
+QUESTION_SECTIONS = [
+    (re.compile(r'\b(skill|keyword|ats|technolog|tool)', re.IGNORECASE), ['Skills', 'Experience']),
+    (re.compile(r'\b(experience|job|role|work|achievement|impact|bullet)', re.IGNORECASE), ['Experience', 'Projects']),
+    (re.compile(r'\b(education|degree|school|university|college|gpa|course)', re.IGNORECASE), ['Education']),
+    (re.compile(r'\b(summary|profile|objective|intro)', re.IGNORECASE), ['Summary']),
+    (re.compile(r'\b(project)', re.IGNORECASE), ['Projects']),
+    (re.compile(r'\b(certif|license|award)', re.IGNORECASE), ['Certifications', 'Awards']),
+]
+
+_index_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+class ResumeIndex:
+    """Extracted text of one resume, split into named sections"""
+
+    def __init__(self, text, sections):
+        self.text = text
+        self.sections = sections
+
+    @property
+    def usable(self):
+        return len(self.text.strip()) >= MIN_TEXT_CHARS
+
+    def sections_for(self, question):
+        """Return {section: text} relevant to a question (all sections if unsure)"""
+        wanted = []
+        for pattern, names in QUESTION_SECTIONS:
+            if pattern.search(question):
+                wanted.extend(n for n in names if n not in wanted)
+        selected = {n: self.sections[n] for n in wanted if n in self.sections}
+        return selected or self.sections
+
+
+def extract_text(pdf_bytes):
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return "\n".join(page.extract_text() or '' for page in reader.pages)
+
+
+def split_sections(text):
+    """Split resume text on recognised heading lines"""
+    sections = OrderedDict()
+    current = 'Header'
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            current = _HEADING_TO_SECTION[match.group(1).lower()]
+            continue
+        if line.strip():
+            sections.setdefault(current, []).append(line.strip())
+    return OrderedDict((name, "\n".join(lines)) for name, lines in sections.items())
+
+
+def get_index(pdf_hash):
+    """Return the section index for a stored resume, extracting it only once"""
+    with _lock:
+        index = _index_cache.get(pdf_hash)
+        if index is not None:
+            _index_cache.move_to_end(pdf_hash)
+            return index
+
+    pdf_bytes = pdf_store.get(pdf_hash)
+    try:
+        text = extract_text(pdf_bytes) if pdf_bytes else ''
+    except Exception:
+        text = ''
+    index = ResumeIndex(text, split_sections(text))
+
+    with _lock:
+        _index_cache[pdf_hash] = index
+        while len(_index_cache) > MAX_CACHED_RESUMES:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def build_prompt(index, question):
+    """Prompt holding only the resume sections relevant to the question"""
+    sections = index.sections_for(question)
+    resume_text = "\n\n".join(f"## {name}\n{text}" for name, text in sections.items())
+    return f"""You are reviewing a resume. Relevant sections of it are below.
+
+{resume_text}
+
+Question: {question}"""
+
+
+def ask(file_ref, pdf_hash, question):
+    """Answer a follow-up question from the extracted text, or the file if it has none"""
+    index = get_index(pdf_hash)
+    if index.usable:
+        return ai_gateway.get_ai_response(build_prompt(index, question))
+    return ai_gateway.get_ai_response([file_ref, question])
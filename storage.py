@@ -0,0 +1,302 @@
+"""SQLite-backed persistence for results, comments, documents and chats.
+
+One database file per server, opened in WAL mode so readers never block the
+writer. Connections come from a small pool and every query uses a constant
+SQL string, so sqlite3's per-connection statement cache reuses the prepared
+statement instead of re-parsing it.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DB_PATH = os.environ.get('FMF_DB_PATH', 'fuel_my_future.db')
+POOL_SIZE = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    source_key TEXT,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT,
+    time TEXT,
+    score INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    company TEXT,
+    position TEXT,
+    content TEXT,
+    created_at REAL NOT NULL,
+    UNIQUE (user_id, source_key)
+);
+CREATE INDEX IF NOT EXISTS idx_results_user ON results (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    result_id INTEGER NOT NULL REFERENCES results (id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_comments_result ON comments (result_id);
+
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    tldr TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_user ON documents (user_id, kind);
+
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    meta TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_user ON chat_messages (user_id, channel, id);
+"""
+
+RESULT_ORDERS = {
+    'newest': 'created_at DESC',
+    'oldest': 'created_at ASC',
+    'score_desc': 'score DESC, created_at DESC',
+    'score_asc': 'score ASC, created_at DESC'
+}
+
+DOCUMENT_ORDERS = {
+    'newest': 'date DESC, id DESC',
+    'oldest': 'date ASC, id ASC',
+    'title': 'title ASC'
+}
+
+_SELECT_RESULT_BY_KEY = "SELECT id FROM results WHERE user_id = ? AND source_key = ?"
+_INSERT_RESULT = """INSERT INTO results
+    (user_id, source_key, type, title, date, time, score, status, company, position, content, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+_UPDATE_RESULT = """UPDATE results SET type = ?, title = ?, date = ?, time = ?, score = ?, status = ?,
+    company = ?, position = ?, content = ? WHERE id = ?"""
+_DELETE_COMMENTS = "DELETE FROM comments WHERE result_id = ?"
+_INSERT_COMMENT = "INSERT INTO comments (result_id, title, text) VALUES (?, ?, ?)"
+_INSERT_OWN_COMMENT = """INSERT INTO comments (result_id, title, text)
+    SELECT id, ?, ? FROM results WHERE id = ? AND user_id = ?"""
+_SELECT_RESULT = "SELECT * FROM results WHERE id = ? AND user_id = ?"
+_INSERT_DOCUMENT = """INSERT INTO documents (user_id, kind, title, date, type, tldr, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)"""
+_RENAME_DOCUMENT = "UPDATE documents SET title = ? WHERE id = ? AND user_id = ?"
+_DELETE_DOCUMENT = "DELETE FROM documents WHERE id = ? AND user_id = ?"
+_INSERT_CHAT = """INSERT INTO chat_messages (user_id, channel, role, content, meta, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+_SELECT_CHAT = """SELECT role, content, meta FROM (
+    SELECT id, role, content, meta FROM chat_messages
+    WHERE user_id = ? AND channel = ? ORDER BY id DESC LIMIT ?
+) ORDER BY id ASC"""
+_DELETE_CHAT = "DELETE FROM chat_messages WHERE user_id = ? AND channel = ?"
+
+
+class ConnectionPool:
+    """Small pool of SQLite connections shared by every session in the process"""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, cached_statements=128)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success and rolls back on error"""
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                with conn:
+                    yield conn
+            finally:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+# ========================================
+# RESULTS AND COMMENTS
+# ========================================
+def save_result(user_id, result, source_key=None):
+    """Insert a result with its comments, or replace it if source_key already exists"""
+    values = (
+        result.get('type', 'interview'),
+        result.get('title', 'Result'),
+        result.get('date', ''),
+        result.get('time'),
+        int(result.get('score', 0)),
+        result.get('status'),
+        result.get('company'),
+        result.get('position'),
+        result.get('content', '')
+    )
+    with get_pool().connection() as conn:
+        row = None
+        if source_key is not None:
+            row = conn.execute(_SELECT_RESULT_BY_KEY, (user_id, source_key)).fetchone()
+        if row is None:
+            cur = conn.execute(_INSERT_RESULT, (user_id, source_key) + values + (time.time(),))
+            result_id = cur.lastrowid
+        else:
+            result_id = row['id']
+            conn.execute(_UPDATE_RESULT, values + (result_id,))
+            conn.execute(_DELETE_COMMENTS, (result_id,))
+        conn.executemany(_INSERT_COMMENT, [
+            (result_id, c.get('title', ''), c.get('text', '')) for c in result.get('comments', [])
+        ])
+    return result_id
+
+
+def add_comment(user_id, result_id, title, text):
+    """Add a note to one of the user's results; returns False if it isn't theirs"""
+    with get_pool().connection() as conn:
+        cur = conn.execute(_INSERT_OWN_COMMENT, (title, text, result_id, user_id))
+    return cur.rowcount > 0
+
+
+def _attach_comments(conn, rows):
+    results = [dict(row) for row in rows]
+    if not results:
+        return results
+    by_id = {r['id']: r for r in results}
+    for r in results:
+        r['comments'] = []
+    placeholders = ','.join('?' * len(by_id))
+    comment_rows = conn.execute(
+        f"SELECT result_id, title, text FROM comments WHERE result_id IN ({placeholders}) ORDER BY id",
+        tuple(by_id)
+    )
+    for c in comment_rows:
+        by_id[c['result_id']]['comments'].append({'title': c['title'], 'text': c['text']})
+    return results
+
+
+def get_result(user_id, result_id):
+    """Return one of the user's results with its comments, or None"""
+    with get_pool().connection() as conn:
+        results = _attach_comments(conn, conn.execute(_SELECT_RESULT, (result_id, user_id)).fetchall())
+    return results[0] if results else None
+
+
+def list_results(user_id, result_type=None, min_score=None, max_score=None, search=None, order='newest'):
+    """Return the user's results matching the filters, with comments attached"""
+    clauses = ["user_id = ?"]
+    params = [user_id]
+    if result_type:
+        clauses.append("type = ?")
+        params.append(result_type)
+    if min_score is not None:
+        clauses.append("score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        clauses.append("score < ?")
+        params.append(max_score)
+    if search:
+        clauses.append("title LIKE ? ESCAPE '\\'")
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params.append(f"%{escaped}%")
+    sql = (f"SELECT * FROM results WHERE {' AND '.join(clauses)} "
+           f"ORDER BY {RESULT_ORDERS.get(order, RESULT_ORDERS['newest'])}")
+    with get_pool().connection() as conn:
+        return _attach_comments(conn, conn.execute(sql, params).fetchall())
+
+
+# ========================================
+# DOCUMENTS
+# ========================================
+def save_document(user_id, kind, doc):
+    """Store a document card ('resume' or 'other') and return its ID"""
+    with get_pool().connection() as conn:
+        cur = conn.execute(_INSERT_DOCUMENT, (
+            user_id, kind, doc['title'], doc['date'], doc['type'], doc.get('tldr'), time.time()
+        ))
+    return cur.lastrowid
+
+
+def list_documents(user_id, kind, order='newest'):
+    sql = (f"SELECT id, title, date, type, tldr FROM documents WHERE user_id = ? AND kind = ? "
+           f"ORDER BY {DOCUMENT_ORDERS.get(order, DOCUMENT_ORDERS['newest'])}")
+    with get_pool().connection() as conn:
+        return [dict(row) for row in conn.execute(sql, (user_id, kind))]
+
+
+def rename_document(user_id, doc_id, title):
+    with get_pool().connection() as conn:
+        conn.execute(_RENAME_DOCUMENT, (title, doc_id, user_id))
+
+
+def delete_document(user_id, doc_id):
+    with get_pool().connection() as conn:
+        conn.execute(_DELETE_DOCUMENT, (doc_id, user_id))
+
+
+# ========================================
+# CHAT MESSAGES
+# ========================================
+def append_chat_message(user_id, channel, role, content, meta=None):
+    with get_pool().connection() as conn:
+        conn.execute(_INSERT_CHAT, (
+            user_id, channel, role, content, json.dumps(meta) if meta else None, time.time()
+        ))
+
+
+def recent_chat_messages(user_id, channel, limit):
+    """Return the last `limit` messages of a channel, oldest first"""
+    with get_pool().connection() as conn:
+        rows = conn.execute(_SELECT_CHAT, (user_id, channel, limit)).fetchall()
+    messages = []
+    for row in rows:
+        message = json.loads(row['meta']) if row['meta'] else {}
+        message.update({'role': row['role'], 'content': row['content']})
+        messages.append(message)
+    return messages
+
+
+def clear_chat(user_id, channel):
+    with get_pool().connection() as conn:
+        conn.execute(_DELETE_CHAT, (user_id, channel))
@@ -0,0 +1,132 @@
+"""Content-addressed Gemini file uploads.
+
+PDF bytes are hashed with SHA-256 and the resulting remote file reference is
+kept in a process-wide map until it expires, so analysing a resume that was
+uploaded earlier (by any session) skips the upload round-trip. A background
+sweeper deletes expired references.
+"""
+import hashlib
+import io
+import threading
+import time
+from datetime import datetime
+
+import ai_gateway
+
+# Gemini keeps uploaded files for 48 hours; assume a little less if the SDK doesn't say
+DEFAULT_FILE_TTL_SECONDS = 47 * 3600
+
+# Don't hand out references that are about to expire mid-conversation
+EXPIRY_MARGIN_SECONDS = 15 * 60
+
+SWEEP_INTERVAL_SECONDS = 10 * 60
+
+_files = {}
+_lock = threading.Lock()
+_hash_locks = {}
+_sweeper = None
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def iter_hashed_chunks(fileobj, hasher):
+    """Yield a file-like object's chunks from the start, feeding each into `hasher`"""
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        yield chunk
+
+
+def _expires_at(file_ref):
+    """Expiry of a remote file as a unix timestamp"""
+    expiration = getattr(file_ref, 'expiration_time', None)
+    if isinstance(expiration, datetime):
+        return expiration.timestamp()
+    return time.time() + DEFAULT_FILE_TTL_SECONDS
+
+
+def _upload(pdf):
+    """Upload bytes or a file-like object straight from memory, no temp file"""
+    if isinstance(pdf, (bytes, bytearray)):
+        pdf = io.BytesIO(pdf)
+    pdf.seek(0)
+    return ai_gateway.upload(pdf)
+
+
+def _lock_for(digest):
+    with _lock:
+        return _hash_locks.setdefault(digest, threading.Lock())
+
+
+def lookup(digest):
+    """Return a live remote reference for a content hash, or None"""
+    with _lock:
+        entry = _files.get(digest)
+    if entry and entry[1] - EXPIRY_MARGIN_SECONDS > time.time():
+        return entry[0]
+    return None
+
+
+def get_or_upload(pdf, digest=None):
+    """Return (file reference, reused) for the PDF, uploading only if needed.
+
+    `pdf` is bytes or a seekable file-like object such as an UploadedFile.
+    """
+    if digest is None:
+        if isinstance(pdf, (bytes, bytearray)):
+            digest = content_hash(pdf)
+        else:
+            hasher = hashlib.sha256()
+            for _ in iter_hashed_chunks(pdf, hasher):
+                pass
+            digest = hasher.hexdigest()
+    # One upload per hash even when several sessions submit the same file at once
+    with _lock_for(digest):
+        file_ref = lookup(digest)
+        if file_ref is not None:
+            return file_ref, True
+        file_ref = _upload(pdf)
+        with _lock:
+            _files[digest] = (file_ref, _expires_at(file_ref))
+    _start_sweeper()
+    return file_ref, False
+
+
+def sweep_expired():
+    """Forget expired references and delete them remotely"""
+    now = time.time()
+    with _lock:
+        expired = [digest for digest, (_, expires_at) in _files.items()
+                   if expires_at - EXPIRY_MARGIN_SECONDS <= now]
+        refs = [_files.pop(digest)[0] for digest in expired]
+        for digest in expired:
+            _hash_locks.pop(digest, None)
+    for file_ref in refs:
+        try:
+            ai_gateway.delete_file(file_ref)
+        except Exception:
+            # Already gone on the server side
+            pass
+    return len(refs)
+
+
+def _sweep_forever():
+    while True:
+        time.sleep(SWEEP_INTERVAL_SECONDS)
+        sweep_expired()
+
+
+def _start_sweeper():
+    global _sweeper
+    with _lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep_forever, name="upload-sweeper", daemon=True)
+            _sweeper.start()
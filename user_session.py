@@ -0,0 +1,28 @@
+"""Stable per-browser user ID used to key stored results, documents and chats,
+and a per-session ID for state shared between sessions in this process.
+
+There are no accounts: the ID is the only thing that ties a browser to its
+data, and it is kept in the `uid` query parameter so a refresh keeps it.
+Anyone holding a URL with that parameter can see and change that user's
+results, documents and chats, so app URLs should not be shared as-is.
+"""
+import uuid
+
+import streamlit as st
+
+
+def get_user_id():
+    """Return this browser's user ID, kept in the URL so it survives a refresh"""
+    if 'user_id' not in st.session_state:
+        st.session_state.user_id = st.query_params.get('uid') or uuid.uuid4().hex
+    # Page switches drop query params, so put it back on every page
+    if st.query_params.get('uid') != st.session_state.user_id:
+        st.query_params['uid'] = st.session_state.user_id
+    return st.session_state.user_id
+
+
+def get_session_id():
+    """Return an ID for this browser session (tab); unlike the user ID it is never shared"""
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id